@@ -0,0 +1,32 @@
+import argparse
+import json
+from dotenv import load_dotenv
+from src.jobs.runner import run_batch
+
+def run_ai_dub_sync_batch():
+    """
+    Runs AI-DubSync over a manifest of videos (JSONL or CSV of URL x languages).
+    Job status is kept in a SQLite queue, so re-running after a crash resumes the batch.
+    """
+    parser = argparse.ArgumentParser(description="Dub many videos into many languages.")
+    parser.add_argument("manifest", nargs="?", help="JSONL or CSV manifest; omit to resume the existing queue")
+    parser.add_argument("--workers", type=int, help="Number of concurrent jobs (default: BATCH_WORKERS or 2)")
+    parser.add_argument("--processes", action="store_true", help="Run jobs in worker processes instead of threads")
+    parser.add_argument("--queue", help="Path of the SQLite job queue (default: JOB_QUEUE_PATH or ./jobs.db)")
+    parser.add_argument("--retry-failed", action="store_true", help="Run previously failed jobs again")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Run the jobs as coroutines on one event loop with the async graph")
+    parser.add_argument("--encoding-profile",
+                        help="Encoding profile for manifest entries that do not name one (default: ENCODING_PROFILE)")
+    args = parser.parse_args()
+    load_dotenv()
+
+    print("--- Welcome to AI-DubSync (batch mode) ---")
+    stats = run_batch(args.manifest, args.workers, args.processes, args.queue, args.retry_failed, args.use_async,
+                      args.encoding_profile)
+
+    print("\n--- A.I. DUB-SYNC BATCH COMPLETE ---")
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    run_ai_dub_sync_batch()
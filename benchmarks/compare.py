@@ -0,0 +1,83 @@
+import argparse
+import json
+import sys
+
+# Default relative slowdown reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+# Timings below this are dominated by noise and never count as regressions
+MIN_SECONDS = 0.05
+
+METRICS = ("wall_s", "cpu_s", "peak_rss_mb", "bytes_written")
+
+
+def _rows(results: dict) -> dict:
+    """
+    Flattens a results file into {(case, kind, name): metrics}.
+    """
+    rows = {}
+    for case in results["cases"]:
+        rows[(case["name"], "total", "graph")] = case["total"]
+        for name, metrics in case.get("micro", {}).items():
+            rows[(case["name"], "micro", name)] = metrics
+        for name, metrics in case.get("nodes", {}).items():
+            rows[(case["name"], "node", name)] = metrics
+    return rows
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD,
+                    metrics: tuple = ("wall_s", "cpu_s")) -> list:
+    """
+    Compares two benchmark results and prints a table of relative changes.
+
+    Returns:
+        list: (case, kind, name, metric, old, new) for every change above the threshold.
+    """
+    base_rows = _rows(baseline)
+    regressions = []
+    print(f"Comparing {baseline.get('commit', '?')[:10]} -> {current.get('commit', '?')[:10]}")
+    print(f"{'case':<12} {'kind':<6} {'name':<38} {'metric':<14} {'baseline':>12} {'current':>12} {'change':>8}")
+
+    for key, metrics_now in _rows(current).items():
+        metrics_then = base_rows.get(key)
+        if metrics_then is None:
+            continue
+        for metric in METRICS:
+            old, new = metrics_then.get(metric), metrics_now.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            flag = ""
+            is_time = metric.endswith("_s")
+            if metric in metrics and change > threshold and not (is_time and max(old, new) < MIN_SECONDS):
+                regressions.append((*key, metric, old, new))
+                flag = "  <-- regression"
+            print(f"{key[0]:<12} {key[1]:<6} {key[2]:<38} {metric:<14} {old:>12.4g} {new:>12.4g} {change:>+7.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {threshold:.0%}.")
+    else:
+        print(f"\nNo regression above {threshold:.0%}.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two AI-DubSync benchmark result files.")
+    parser.add_argument("baseline", help="Results JSON of the reference commit")
+    parser.add_argument("current", help="Results JSON to check")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown that counts as a regression (default: 0.10)")
+    parser.add_argument("--metric", action="append", choices=METRICS,
+                        help="Metric(s) checked for regressions (default: wall_s and cpu_s)")
+    args = parser.parse_args()
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    regressions = compare_results(baseline, current, args.threshold, tuple(args.metric or ("wall_s", "cpu_s")))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import re
+import ffmpeg
+
+# Speech-like audio: a tone that pauses for one second every SPEECH_PERIOD seconds,
+# so the silence-based chunking behaves as it does on real speech
+SPEECH_PERIOD = 5
+
+_CASE = re.compile(r"^(\d+(?:\.\d+)?)s@(\d+)p$")
+
+
+def parse_case(case: str) -> tuple:
+    """
+    Parses a case name such as '120s@720p' into (duration seconds, width, height),
+    with a 16:9 width rounded to an even number of pixels.
+    """
+    match = _CASE.match(case.strip())
+    if not match:
+        raise ValueError(f"Invalid case '{case}'; expected e.g. '30s@360p'.")
+    duration, height = float(match.group(1)), int(match.group(2))
+    width = int(round(height * 16 / 9 / 2)) * 2
+    return duration, width, height
+
+
+def make_synthetic_video(path: str, duration: float, width: int, height: int, fps: int = 25) -> str:
+    """
+    Generates an H.264/AAC MP4 with a moving test pattern and speech-like audio.
+    Existing files are re-used, so repeated benchmark runs measure the same input.
+    """
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    video = ffmpeg.input(f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}", f="lavfi")
+    audio = (
+        ffmpeg.input(f"sine=frequency=220:sample_rate=44100:duration={duration}", f="lavfi")
+        .filter("volume", volume=f"if(lt(mod(t,{SPEECH_PERIOD}),{SPEECH_PERIOD - 1}),0.5,0)", eval="frame")
+    )
+    partial_path = f"{path}.part.mp4"
+    (
+        ffmpeg.output(video, audio, partial_path, vcodec="libx264", preset="veryfast", pix_fmt="yuv420p",
+                      acodec="aac", audio_bitrate="128k", movflags="+faststart")
+        .overwrite_output()
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    os.replace(partial_path, path)
+    return path
+
+
+def describe_video(path: str) -> dict:
+    """
+    Returns the duration, resolution and size of a video file.
+    """
+    probe = ffmpeg.probe(path)
+    video = next((s for s in probe["streams"] if s["codec_type"] == "video"), {})
+    return {
+        "duration_s": round(float(probe["format"]["duration"]), 2),
+        "resolution": f"{video.get('width')}x{video.get('height')}",
+        "size_bytes": int(probe["format"]["size"]),
+    }
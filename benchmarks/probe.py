@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# How often memory and child-process I/O are sampled while a measurement runs
+SAMPLE_INTERVAL = 0.02
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_HAS_PROC = os.path.exists("/proc/self/statm")
+
+
+def _cpu_seconds() -> float:
+    """
+    CPU time of this process plus all finished child processes (ffmpeg does most of the work).
+    """
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _rss_bytes(pid: str) -> int:
+    fields = _read(f"/proc/{pid}/statm").split()
+    return int(fields[1]) * _PAGE_SIZE if len(fields) > 1 else 0
+
+
+def _written_bytes(pid: str) -> int:
+    for line in _read(f"/proc/{pid}/io").splitlines():
+        if line.startswith("write_bytes:"):
+            return int(line.split()[1])
+    return 0
+
+
+def _descendants(pid: str) -> list:
+    children = []
+    for tid in os.listdir(f"/proc/{pid}/task") if os.path.isdir(f"/proc/{pid}/task") else []:
+        children.extend(_read(f"/proc/{pid}/task/{tid}/children").split())
+    return children + [grandchild for child in children for grandchild in _descendants(child)]
+
+
+class Measurement:
+    """
+    Measures a block of code: wall time, CPU time (including child processes), peak RSS
+    and bytes written.
+
+    On Linux a sampler thread reads /proc every SAMPLE_INTERVAL: the peak RSS is that of
+    this process plus its live child processes, and bytes written counts what this process
+    and every child seen while it ran wrote to storage (pipes are not counted). Elsewhere
+    only wall and CPU time are exact; the peak RSS is the process high-water mark.
+    CPU time and I/O are process-wide, so background threads (e.g. the video download)
+    are counted in whichever measurement is running.
+    """
+
+    def __enter__(self):
+        self._stop = threading.Event()
+        self._peak_rss = 0
+        self._child_written = {}
+        self._own_written_start = _written_bytes("self") if _HAS_PROC else 0
+        self._cpu_start = _cpu_seconds()
+        self._wall_start = time.perf_counter()
+        if _HAS_PROC:
+            self._sample()
+            self._sampler = threading.Thread(target=self._run_sampler, daemon=True)
+            self._sampler.start()
+        return self
+
+    def _sample(self):
+        children = _descendants(str(os.getpid()))
+        rss = _rss_bytes("self") + sum(_rss_bytes(child) for child in children)
+        self._peak_rss = max(self._peak_rss, rss)
+        for child in children:
+            written = _written_bytes(child)
+            if written:
+                self._child_written[child] = max(self._child_written.get(child, 0), written)
+
+    def _run_sampler(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            self._sample()
+
+    def __exit__(self, *exc_info):
+        self.wall_s = time.perf_counter() - self._wall_start
+        self.cpu_s = _cpu_seconds() - self._cpu_start
+        if _HAS_PROC:
+            self._stop.set()
+            self._sampler.join()
+            self._sample()
+            self.bytes_written = _written_bytes("self") - self._own_written_start + sum(self._child_written.values())
+        else:
+            self.bytes_written = None
+            if resource is not None:
+                scale = 1 if os.uname().sysname == "Darwin" else 1024
+                self._peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        self.peak_rss_mb = self._peak_rss / (1024 * 1024) if self._peak_rss else None
+        return False
+
+    def as_dict(self) -> dict:
+        return {
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+            "bytes_written": self.bytes_written,
+        }
+
+
+def merge(measurements: list) -> dict:
+    """
+    Combines several runs of the same node in one job (e.g. one per language branch):
+    times and bytes add up, the peak RSS is the highest one.
+    """
+    peaks = [m["peak_rss_mb"] for m in measurements if m["peak_rss_mb"] is not None]
+    written = [m["bytes_written"] for m in measurements if m["bytes_written"] is not None]
+    return {
+        "wall_s": round(sum(m["wall_s"] for m in measurements), 4),
+        "cpu_s": round(sum(m["cpu_s"] for m in measurements), 4),
+        "peak_rss_mb": max(peaks) if peaks else None,
+        "bytes_written": sum(written) if written else None,
+        "runs": len(measurements),
+    }
@@ -0,0 +1,263 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.compare import compare_results
+from benchmarks.media import describe_video, make_synthetic_video, parse_case
+from benchmarks.probe import Measurement, merge
+
+DEFAULT_CASES = "30s@360p,120s@720p"
+DEFAULT_WORK_DIR = "./bench"
+
+
+def _commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _configure_environment(work_dir: str, backend: str):
+    """
+    Points the pipeline at the benchmark directory and at the offline backends,
+    with caching, checkpoints and the translation memory off so every run does
+    the full work.
+    """
+    os.environ["AI_BACKEND"] = backend
+    os.environ.setdefault("LOCAL_LATENCY_SECONDS", "0")
+    os.environ["CACHE_ENABLED"] = "false"
+    os.environ["CHECKPOINTS_ENABLED"] = "false"
+    os.environ["TRANSLATION_MEMORY_ENABLED"] = "false"
+    os.environ["KEEP_INTERMEDIATES"] = "false"
+    os.environ["OUTPUT_DIRECTORY"] = os.path.join(work_dir, "output")
+    os.environ["TEMP_DIRECTORY"] = os.path.join(work_dir, "temp")
+
+
+def _median(runs: list) -> dict:
+    """
+    Reduces repeated measurements of the same thing to the median of every metric.
+    """
+    result = {}
+    for metric in runs[0]:
+        values = [run[metric] for run in runs if run.get(metric) is not None]
+        result[metric] = statistics.median(values) if values else None
+    return result
+
+
+def _quiet(verbose: bool):
+    # The pipeline prints progress for every node and tool; keep the report readable
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def benchmark_micro(source: str, work_dir: str, include_reencode: bool) -> dict:
+    """
+    Measures the media functions that dominate the CPU cost of a job on their own:
+    audio extraction plus the video stream copy, muxing the dub into the video and,
+    optionally, the re-encode fallback both in one piece and in parallel segments.
+    """
+    from src.tools.media_tools import (
+        combine_video_and_audio, download_video_and_extract_audio, get_media_duration, wait_for_video,
+    )
+    from src.tools.video_encoding import encode_video_and_audio
+
+    micro_dir = os.path.join(work_dir, "micro")
+    shutil.rmtree(micro_dir, ignore_errors=True)
+    os.makedirs(micro_dir)
+    results = {}
+
+    with Measurement() as m:
+        extracted = download_video_and_extract_audio(source, micro_dir)
+        if "error" in extracted:
+            raise RuntimeError(extracted["error"])
+        waited = wait_for_video(extracted["video_path"])
+        if "error" in waited:
+            raise RuntimeError(waited["error"])
+    results["download_video_and_extract_audio"] = m.as_dict()
+
+    with Measurement() as m:
+        combined = combine_video_and_audio(extracted["video_path"], extracted["audio_path"],
+                                           os.path.join(micro_dir, "combined.mp4"))
+        if "error" in combined:
+            raise RuntimeError(combined["error"])
+    results["combine_video_and_audio"] = m.as_dict()
+
+    if include_reencode:
+        # Short enough for the synthetic videos to split into several segments
+        segment_seconds = max(1.0, get_media_duration(extracted["video_path"]) / 4)
+        for mode, seconds in (("single", 0), ("segmented", segment_seconds)):
+            with Measurement() as m:
+                encode_video_and_audio(extracted["video_path"], extracted["audio_path"],
+                                       os.path.join(micro_dir, f"encoded_{mode}.mp4"), segment_seconds=seconds)
+            results[f"encode_video_and_audio[{mode}]"] = m.as_dict()
+
+    shutil.rmtree(micro_dir, ignore_errors=True)
+    return results
+
+
+def benchmark_graph(source: str, languages: list, job_id: str) -> tuple:
+    """
+    Runs the whole graph on a local source and measures every node and the whole run.
+
+    Returns:
+        tuple: ({node name: merged metrics}, total metrics).
+    """
+    from src.graph import create_graph, create_multilang_graph
+
+    measurements = {}
+
+    def measured(name, node):
+        def run(state):
+            with Measurement() as m:
+                result = node(state)
+            measurements.setdefault(name, []).append(m.as_dict())
+            return result
+        return run
+
+    if len(languages) == 1:
+        graph = create_graph(node_wrapper=measured)
+    else:
+        graph = create_multilang_graph(node_wrapper=measured)
+
+    with Measurement() as total:
+        final_state = graph.invoke({
+            "job_id": job_id,
+            "youtube_url": source,
+            "target_language": languages[0],
+            "target_languages": languages,
+            "error": None,
+        })
+    errors = [final_state.get("error")] + [dub.get("error") for dub in (final_state.get("dubs") or {}).values()]
+    errors = [error for error in errors if error]
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+    return {name: merge(runs) for name, runs in measurements.items()}, total.as_dict()
+
+
+def run_benchmarks(cases: list, sources: list, languages: list, repeat: int, work_dir: str,
+                   include_reencode: bool = True, verbose: bool = False) -> dict:
+    """
+    Benchmarks every synthetic case and local source file.
+
+    Returns:
+        dict: The results, ready to be written as JSON and compared between commits.
+    """
+    inputs = []
+    for case in cases:
+        duration, width, height = parse_case(case)
+        path = os.path.join(work_dir, "media", f"{case.replace('@', '_')}.mp4")
+        print(f"Preparing synthetic video {case}...")
+        inputs.append((case, make_synthetic_video(path, duration, width, height)))
+    inputs.extend((os.path.basename(source), os.path.abspath(source)) for source in sources)
+
+    results = []
+    for name, source in inputs:
+        print(f"Benchmarking {name} ({repeat} run(s))...")
+        micro_runs, node_runs, total_runs = {}, {}, []
+        for index in range(repeat):
+            with _quiet(verbose):
+                for function, metrics in benchmark_micro(source, work_dir, include_reencode).items():
+                    micro_runs.setdefault(function, []).append(metrics)
+                nodes, total = benchmark_graph(source, languages, f"bench-{name.replace('@', '_')}-{index}")
+            for node, metrics in nodes.items():
+                node_runs.setdefault(node, []).append(metrics)
+            total_runs.append(total)
+            print(f"  run {index + 1}: {total['wall_s']:.2f}s wall, {total['cpu_s']:.2f}s CPU")
+
+        results.append({
+            "name": name,
+            "source": source,
+            **describe_video(source),
+            "micro": {function: _median(runs) for function, runs in micro_runs.items()},
+            "nodes": {node: _median(runs) for node, runs in node_runs.items()},
+            "total": _median(total_runs),
+        })
+
+    return {
+        "commit": _commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "platform": {
+            "python": platform.python_version(),
+            "system": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "languages": languages,
+            "repeat": repeat,
+            "backend": os.environ.get("AI_BACKEND"),
+            "media_concurrency": os.environ.get("MEDIA_CONCURRENCY"),
+        },
+        "cases": results,
+    }
+
+
+def print_report(results: dict):
+    for case in results["cases"]:
+        print(f"\n{case['name']} ({case['duration_s']}s, {case['resolution']})")
+        print(f"  {'step':<44} {'wall s':>9} {'cpu s':>9} {'peak MB':>9} {'written MB':>11}")
+        rows = [(f"[micro] {name}", m) for name, m in case["micro"].items()]
+        rows += [(f"[node] {name}", m) for name, m in case["nodes"].items()]
+        rows.append(("[total] graph", case["total"]))
+        for label, m in rows:
+            peak = f"{m['peak_rss_mb']:.0f}" if m.get("peak_rss_mb") is not None else "-"
+            written = f"{m['bytes_written'] / 1e6:.1f}" if m.get("bytes_written") is not None else "-"
+            print(f"  {label:<44} {m['wall_s']:>9.3f} {m['cpu_s']:>9.3f} {peak:>9} {written:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AI-DubSync pipeline on synthetic or local videos.")
+    parser.add_argument("--cases", default=DEFAULT_CASES,
+                        help=f"Comma-separated synthetic videos as <seconds>s@<height>p (default: {DEFAULT_CASES}); "
+                             "pass an empty string for none")
+    parser.add_argument("--source", action="append", default=[], help="A local video file to benchmark as well")
+    parser.add_argument("--languages", default="Turkish", help="Comma-separated target languages (default: Turkish)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the median is reported")
+    parser.add_argument("--backend", default="local", help="AI backend to use (default: local, i.e. offline)")
+    parser.add_argument("--work-dir", default=DEFAULT_WORK_DIR, help="Directory for media, workspaces and results")
+    parser.add_argument("--output", help="Where to write the results JSON (default: <work-dir>/results-<commit>.json)")
+    parser.add_argument("--compare", help="A previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Regression threshold for --compare")
+    parser.add_argument("--no-reencode", action="store_true", help="Skip the slow re-encode fallback benchmarks")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args()
+
+    # Read the baseline first: with the default output name it may be overwritten below
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    work_dir = os.path.abspath(args.work_dir)
+    _configure_environment(work_dir, args.backend)
+    cases = [case for case in args.cases.split(",") if case.strip()]
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+
+    results = run_benchmarks(cases, args.source, languages, max(1, args.repeat), work_dir,
+                             include_reencode=not args.no_reencode, verbose=args.verbose)
+    print_report(results)
+
+    output = args.output or os.path.join(work_dir, f"results-{results['commit'][:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline is not None:
+        print()
+        if compare_results(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
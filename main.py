@@ -1,33 +1,45 @@
 import json
-from src.graph import app_graph
+from dotenv import load_dotenv
+from src.graph import get_app_graph, create_multilang_graph
+from src.tools.cache import get_cache
 
 def run_ai_dub_sync():
     """
     The main function to run the AI-DubSync process.
     """
     print("--- Welcome to AI-DubSync ---")
+    # Settings (API key, cache, concurrency, ...) may come from the .env file
+    load_dotenv()
     
     # --- Get Initial Inputs ---
     # For now, we'll hardcode them. Later, this can come from a user interface.
     test_url = "https://www.youtube.com/watch?v=M-P4QBt-FWw" # A short, English CC video
     target_lang = "Turkish"
+    # Add more languages here to dub into all of them in a single run,
+    # e.g. ["Turkish", "Spanish", "French"]
+    target_langs = [target_lang]
 
     print(f"Starting process for URL: {test_url}")
-    print(f"Target Language: {target_lang}")
+    print(f"Target Language(s): {', '.join(target_langs)}")
 
     # This is the initial dictionary that starts our graph.
     # It must match the structure of our AppState.
     initial_input = {
         "youtube_url": test_url,
         "target_language": target_lang,
+        "target_languages": target_langs,
         "error": None # Start with no errors
     }
 
+    # A single language runs the linear graph; several languages share one
+    # download and transcription and fan out into parallel branches.
+    graph = get_app_graph() if len(target_langs) == 1 else create_multilang_graph()
+
     # --- Invoke the Graph ---
     # The .invoke() method runs the graph from the entry point to the end,
     # passing the state between nodes automatically.
     print("\nInvoking the workflow graph...")
-    final_state = app_graph.invoke(initial_input)
+    final_state = graph.invoke(initial_input)
 
     # --- Display Final Results ---
     print("\n--- A.I. DUB-SYNC WORKFLOW COMPLETE ---")
@@ -44,5 +56,16 @@ def run_ai_dub_sync():
         print("\n--- TRANSCRIPTION ---")
         print(final_state.get("transcription", "No transcription available."))
 
+        for language, dub in final_state.get("dubs", {}).items():
+            if dub.get("error"):
+                print(f"\n[{language}] FAILED: {dub['error']}")
+            else:
+                print(f"\n[{language}] Final video: {dub['final_video_path']}")
+
+    cache = get_cache()
+    if cache:
+        print("\n--- CACHE STATISTICS ---")
+        print(json.dumps(cache.stats(), indent=2))
+
 if __name__ == "__main__":
     run_ai_dub_sync()
\ No newline at end of file
@@ -0,0 +1,23 @@
+import argparse
+from dotenv import load_dotenv
+from src.jobs.service import run_service
+
+def run_ai_dub_sync_service():
+    """
+    Serves AI-DubSync over HTTP: jobs are submitted with POST /jobs and their progress is
+    streamed from GET /jobs/<job_id>/events (see src/jobs/service.py).
+    """
+    parser = argparse.ArgumentParser(description="Serve the dubbing pipeline as a local HTTP API.")
+    parser.add_argument("--host", help="Address to listen on (default: SERVICE_HOST or 127.0.0.1)")
+    parser.add_argument("--port", type=int, help="Port to listen on (default: SERVICE_PORT or 8080)")
+    parser.add_argument("--workers", type=int, help="Jobs run at the same time (default: SERVICE_WORKERS or 2)")
+    parser.add_argument("--queue-size", type=int,
+                        help="Jobs that may wait for a worker before new ones get 429 (default: SERVICE_QUEUE_SIZE or 16)")
+    args = parser.parse_args()
+    load_dotenv()
+
+    print("--- Welcome to AI-DubSync (service mode) ---")
+    run_service(args.host, args.port, args.workers, args.queue_size)
+
+if __name__ == "__main__":
+    run_ai_dub_sync_service()
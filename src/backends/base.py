@@ -0,0 +1,113 @@
+import asyncio
+
+
+class TranscriptionBackend:
+    """
+    A provider for the transcription stage. Implementations report failures as
+    {'error': message} like every other tool, so the engines can retry them.
+    """
+
+    # Identifies the backend and its model in cache keys, so results of different
+    # providers are never mixed up
+    model_name = "base"
+
+    def transcribe_chunk(self, audio_path: str, duration: float) -> dict:
+        """
+        Transcribes one audio chunk into timed segments.
+
+        Returns:
+            dict: {'segments': [{'start', 'end', 'text', 'speaker'}, ...]} with times
+                  relative to the start of the chunk.
+                  Returns {'error': message} on failure.
+        """
+        raise NotImplementedError
+
+    async def transcribe_chunk_async(self, audio_path: str, duration: float) -> dict:
+        return await asyncio.to_thread(self.transcribe_chunk, audio_path, duration)
+
+    # The long-audio pipeline uploads the next window while the current one is being
+    # transcribed. Remote backends split transcribe_chunk into these three steps; the
+    # defaults suit backends that read the local file directly.
+
+    def upload_chunk(self, audio_path: str) -> dict:
+        """
+        Makes an audio chunk available to the service.
+
+        Returns:
+            dict: {'upload': a handle for transcribe_uploaded and release_chunk}.
+                  Returns {'error': message} on failure.
+        """
+        return {"upload": audio_path}
+
+    def transcribe_uploaded(self, upload, duration: float) -> dict:
+        """
+        Transcribes an uploaded chunk; returns the same as transcribe_chunk.
+        """
+        return self.transcribe_chunk(upload, duration)
+
+    def release_chunk(self, upload):
+        """
+        Frees what upload_chunk created, as soon as the chunk is transcribed.
+        """
+
+    async def upload_chunk_async(self, audio_path: str) -> dict:
+        return await asyncio.to_thread(self.upload_chunk, audio_path)
+
+    async def transcribe_uploaded_async(self, upload, duration: float) -> dict:
+        return await asyncio.to_thread(self.transcribe_uploaded, upload, duration)
+
+    async def release_chunk_async(self, upload):
+        await asyncio.to_thread(self.release_chunk, upload)
+
+
+class TranslationBackend:
+    """
+    A provider for the translation stage.
+    """
+
+    model_name = "base"
+
+    def translate_segments(self, segments: list, target_language: str) -> dict:
+        """
+        Translates a batch of segments.
+
+        Returns:
+            dict: {'translations': {segment id: translated text}}.
+                  Returns {'error': message} on failure.
+        """
+        raise NotImplementedError
+
+    async def translate_segments_async(self, segments: list, target_language: str) -> dict:
+        return await asyncio.to_thread(self.translate_segments, segments, target_language)
+
+
+class TTSBackend:
+    """
+    A provider for the speech synthesis stage. Every request writes one MP3 file.
+    """
+
+    def voice_name(self, language_code: str) -> str:
+        """
+        Returns the voice used for a language code; it is part of the speech cache keys.
+        """
+        raise NotImplementedError
+
+    def audio_config(self) -> str:
+        """
+        Describes the audio the backend writes (encoding, rate, ...); it is part of the
+        speech clip cache keys, so clips in another format are never spliced together.
+        """
+        return "mp3"
+
+    def synthesize(self, text: str, language_code: str, output_path: str) -> dict:
+        """
+        Synthesizes text into an MP3 file.
+
+        Returns:
+            dict: {'dubbed_audio_path': output_path}.
+                  Returns {'error': message} on failure.
+        """
+        raise NotImplementedError
+
+    async def synthesize_async(self, text: str, language_code: str, output_path: str) -> dict:
+        return await asyncio.to_thread(self.synthesize, text, language_code, output_path)
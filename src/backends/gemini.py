@@ -0,0 +1,66 @@
+from src.backends.base import TranscriptionBackend, TranslationBackend, TTSBackend
+from src.tools import gemini_client
+
+
+class GeminiTranscriptionBackend(TranscriptionBackend):
+    """
+    Transcription with Gemini (see gemini_client.transcribe_audio_chunk).
+    """
+
+    model_name = gemini_client.GEMINI_MODEL_NAME
+
+    def transcribe_chunk(self, audio_path: str, duration: float) -> dict:
+        return gemini_client.transcribe_audio_chunk(audio_path, duration)
+
+    async def transcribe_chunk_async(self, audio_path: str, duration: float) -> dict:
+        return await gemini_client.transcribe_audio_chunk_async(audio_path, duration)
+
+    def upload_chunk(self, audio_path: str) -> dict:
+        uploaded = gemini_client.upload_audio(audio_path)
+        return uploaded if "error" in uploaded else {"upload": uploaded["file"]}
+
+    def transcribe_uploaded(self, upload, duration: float) -> dict:
+        return gemini_client.transcribe_uploaded_chunk(upload, duration)
+
+    def release_chunk(self, upload):
+        gemini_client.delete_uploaded_file(upload)
+
+    async def upload_chunk_async(self, audio_path: str) -> dict:
+        uploaded = await gemini_client.upload_audio_async(audio_path)
+        return uploaded if "error" in uploaded else {"upload": uploaded["file"]}
+
+    async def transcribe_uploaded_async(self, upload, duration: float) -> dict:
+        return await gemini_client.transcribe_uploaded_chunk_async(upload, duration)
+
+    async def release_chunk_async(self, upload):
+        await gemini_client.delete_uploaded_file_async(upload)
+
+
+class GeminiTranslationBackend(TranslationBackend):
+    """
+    Translation with Gemini (see gemini_client.translate_segments).
+    """
+
+    model_name = gemini_client.GEMINI_MODEL_NAME
+
+    def translate_segments(self, segments: list, target_language: str) -> dict:
+        return gemini_client.translate_segments(segments, target_language)
+
+    async def translate_segments_async(self, segments: list, target_language: str) -> dict:
+        return await gemini_client.translate_segments_async(segments, target_language)
+
+
+class GoogleTTSBackend(TTSBackend):
+    """
+    Speech synthesis with Google Cloud Text-to-Speech, WaveNet voices by default
+    (see gemini_client.tts_voice_name).
+    """
+
+    def voice_name(self, language_code: str) -> str:
+        return gemini_client.tts_voice_name(language_code)
+
+    def synthesize(self, text: str, language_code: str, output_path: str) -> dict:
+        return gemini_client.text_to_speech(text, language_code, output_path)
+
+    async def synthesize_async(self, text: str, language_code: str, output_path: str) -> dict:
+        return await gemini_client.text_to_speech_async(text, language_code, output_path)
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import re
+import time
+import zlib
+import ffmpeg
+from src.backends.base import TranscriptionBackend, TranslationBackend, TTSBackend
+
+# Defaults, overridable through LOCAL_SEGMENT_SECONDS / LOCAL_TTS_WORDS_PER_MINUTE /
+# LOCAL_TTS_MODE / LOCAL_LATENCY_SECONDS
+DEFAULT_SEGMENT_SECONDS = 4.0
+DEFAULT_WORDS_PER_MINUTE = 150
+DEFAULT_TTS_MODE = "tone"
+DEFAULT_LATENCY_SECONDS = 0.0
+
+# Used when no LOCAL_TRANSCRIPT_FIXTURE is given
+DEFAULT_SENTENCES = [
+    "Welcome back to the channel.",
+    "Today we are going to look at something a little different.",
+    "Let me show you how this works, step by step.",
+    "First, we need to set everything up.",
+    "This part is important, so pay close attention.",
+    "As you can see, the result is exactly what we expected.",
+    "If you have any questions, leave them in the comments below.",
+    "Thanks for watching, and see you in the next video.",
+]
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _latency() -> float:
+    return float(os.getenv("LOCAL_LATENCY_SECONDS", DEFAULT_LATENCY_SECONDS))
+
+
+class LocalTranscriptionBackend(TranscriptionBackend):
+    """
+    A deterministic, offline transcriber for tests and load tests.
+
+    Every chunk is cut into utterances of LOCAL_SEGMENT_SECONDS with short pauses in
+    between. Their text is taken in turn from LOCAL_TRANSCRIPT_FIXTURE (a text file with
+    one sentence per line, or a JSON array of strings) or from a built-in script.
+    LOCAL_LATENCY_SECONDS simulates the response time of a remote service.
+    """
+
+    model_name = "local"
+
+    def __init__(self):
+        self.segment_seconds = max(0.5, float(os.getenv("LOCAL_SEGMENT_SECONDS", DEFAULT_SEGMENT_SECONDS)))
+        self.sentences = self._load_fixture(os.getenv("LOCAL_TRANSCRIPT_FIXTURE")) or DEFAULT_SENTENCES
+
+    @staticmethod
+    def _load_fixture(path: str | None) -> list:
+        if not path:
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                return [str(sentence) for sentence in json.load(f)]
+            return [line.strip() for line in f if line.strip()]
+
+    def _segments(self, audio_path: str, duration: float) -> list:
+        # Chunks start at different sentences, so a long video does not repeat one line
+        first = zlib.crc32(os.path.basename(audio_path).encode("utf-8")) % len(self.sentences)
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.segment_seconds * 0.85, duration)
+            sentence = self.sentences[(first + len(segments)) % len(self.sentences)]
+            segments.append({"start": round(start, 3), "end": round(end, 3), "text": sentence, "speaker": None})
+            start += self.segment_seconds
+        return segments
+
+    def transcribe_chunk(self, audio_path: str, duration: float) -> dict:
+        time.sleep(_latency())
+        return {"segments": self._segments(audio_path, duration)}
+
+    async def transcribe_chunk_async(self, audio_path: str, duration: float) -> dict:
+        await asyncio.sleep(_latency())
+        return {"segments": self._segments(audio_path, duration)}
+
+
+class LocalTranslationBackend(TranslationBackend):
+    """
+    A deterministic, offline translator: returns the text unchanged, or replaces words
+    found in LOCAL_TRANSLATION_DICTIONARY. The dictionary is a JSON object mapping
+    lower-case words to translations, either flat or per language:
+    {"Turkish": {"hello": "merhaba"}, "Spanish": {"hello": "hola"}}.
+    """
+
+    model_name = "local"
+
+    def __init__(self):
+        path = os.getenv("LOCAL_TRANSLATION_DICTIONARY")
+        self.dictionary = {}
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                self.dictionary = json.load(f)
+            self.model_name = f"local:{os.path.basename(path)}"
+
+    def _words_for(self, target_language: str) -> dict:
+        if any(isinstance(value, dict) for value in self.dictionary.values()):
+            return self.dictionary.get(target_language, {})
+        return self.dictionary
+
+    def _translate(self, segments: list, target_language: str) -> dict:
+        words = self._words_for(target_language)
+        translate_word = lambda match: words.get(match.group(0).lower(), match.group(0))
+        return {"translations": {segment["id"]: _WORD.sub(translate_word, segment["text"]) for segment in segments}}
+
+    def translate_segments(self, segments: list, target_language: str) -> dict:
+        time.sleep(_latency())
+        return self._translate(segments, target_language)
+
+    async def translate_segments_async(self, segments: list, target_language: str) -> dict:
+        await asyncio.sleep(_latency())
+        return self._translate(segments, target_language)
+
+
+class LocalTTSBackend(TTSBackend):
+    """
+    An offline TTS stand-in that writes a sine tone (LOCAL_TTS_MODE=tone) or silence
+    (LOCAL_TTS_MODE=silence) as long as the text would take to speak at
+    LOCAL_TTS_WORDS_PER_MINUTE. The clips are real 24 kHz MP3 files, so alignment
+    and muxing do the same work as with real speech.
+    """
+
+    def __init__(self):
+        self.words_per_minute = float(os.getenv("LOCAL_TTS_WORDS_PER_MINUTE", DEFAULT_WORDS_PER_MINUTE))
+        self.mode = os.getenv("LOCAL_TTS_MODE", DEFAULT_TTS_MODE).lower()
+
+    def voice_name(self, language_code: str) -> str:
+        return f"local-{self.mode}"
+
+    def audio_config(self) -> str:
+        # The speaking rate decides the clip lengths
+        return f"mp3-24000-64k-{self.words_per_minute:g}wpm"
+
+    def _duration(self, text: str) -> float:
+        return max(0.3, len(_WORD.findall(text)) * 60.0 / self.words_per_minute)
+
+    def synthesize(self, text: str, language_code: str, output_path: str) -> dict:
+        time.sleep(_latency())
+        return self._write_clip(text, output_path)
+
+    async def synthesize_async(self, text: str, language_code: str, output_path: str) -> dict:
+        await asyncio.sleep(_latency())
+        return await asyncio.to_thread(self._write_clip, text, output_path)
+
+    def _write_clip(self, text: str, output_path: str) -> dict:
+        try:
+            duration = self._duration(text)
+            if self.mode == "silence":
+                source = ffmpeg.input("anullsrc=r=24000:cl=mono", f="lavfi", t=duration)
+            else:
+                source = ffmpeg.input(f"sine=frequency=220:sample_rate=24000:duration={duration:.3f}", f="lavfi")
+            (
+                source.output(output_path, acodec="libmp3lame", ac=1, ar=24000, audio_bitrate="64k")
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+            return {"dubbed_audio_path": output_path}
+        except Exception as e:
+            error_message = f"An error occurred during local speech synthesis: {e}"
+            print(f"ERROR in local backend: {error_message}")
+            return {"error": error_message}
@@ -0,0 +1,60 @@
+import importlib
+import os
+import threading
+
+# Backend classes by stage and name. Modules are imported only when a backend is used,
+# so the local backends never load the Google SDKs.
+BACKENDS = {
+    "transcription": {
+        "gemini": ("src.backends.gemini", "GeminiTranscriptionBackend"),
+        "local": ("src.backends.local", "LocalTranscriptionBackend"),
+    },
+    "translation": {
+        "gemini": ("src.backends.gemini", "GeminiTranslationBackend"),
+        "local": ("src.backends.local", "LocalTranslationBackend"),
+    },
+    "tts": {
+        "google": ("src.backends.gemini", "GoogleTTSBackend"),
+        "gemini": ("src.backends.gemini", "GoogleTTSBackend"),
+        "local": ("src.backends.local", "LocalTTSBackend"),
+    },
+}
+
+# Default, overridable through AI_BACKEND, or per stage through
+# TRANSCRIPTION_BACKEND / TRANSLATION_BACKEND / TTS_BACKEND
+DEFAULT_BACKEND = "gemini"
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(stage: str):
+    """
+    Returns the process-wide backend configured for a stage ('transcription',
+    'translation' or 'tts'), e.g. TTS_BACKEND=local to synthesize offline while
+    transcribing and translating with Gemini.
+
+    Raises:
+        ValueError: If the configured backend does not exist.
+    """
+    name = (os.getenv(f"{stage.upper()}_BACKEND") or os.getenv("AI_BACKEND", DEFAULT_BACKEND)).lower()
+    if name not in BACKENDS[stage]:
+        raise ValueError(f"Unknown {stage} backend '{name}'. Choose one of: {', '.join(BACKENDS[stage])}.")
+
+    with _instances_lock:
+        if (stage, name) not in _instances:
+            module_name, class_name = BACKENDS[stage][name]
+            _instances[(stage, name)] = getattr(importlib.import_module(module_name), class_name)()
+    return _instances[(stage, name)]
+
+
+def get_transcription_backend():
+    return get_backend("transcription")
+
+
+def get_translation_backend():
+    return get_backend("translation")
+
+
+def get_tts_backend():
+    return get_backend("tts")
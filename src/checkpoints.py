@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import threading
+from contextlib import asynccontextmanager
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+# Defaults, overridable through CHECKPOINTS_ENABLED / CHECKPOINT_DB
+DEFAULT_CHECKPOINT_DB = "./checkpoints.db"
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def _enabled() -> bool:
+    return os.getenv("CHECKPOINTS_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def get_checkpointer() -> SqliteSaver | None:
+    """
+    Returns the process-wide SQLite checkpointer, or None when CHECKPOINTS_ENABLED is false.
+    The graph state is saved after every node, keyed by job ID, so a job can be resumed.
+    """
+    global _checkpointer
+    if not _enabled():
+        return None
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            conn = sqlite3.connect(os.getenv("CHECKPOINT_DB", DEFAULT_CHECKPOINT_DB), check_same_thread=False)
+            _checkpointer = SqliteSaver(conn)
+    return _checkpointer
+
+
+@asynccontextmanager
+async def async_checkpointer():
+    """
+    Opens the async SQLite checkpointer for graphs run with ainvoke, on the same database
+    as get_checkpointer(). Yields None when CHECKPOINTS_ENABLED is false.
+    """
+    if not _enabled():
+        yield None
+        return
+    async with AsyncSqliteSaver.from_conn_string(os.getenv("CHECKPOINT_DB", DEFAULT_CHECKPOINT_DB)) as saver:
+        yield saver
+
+
+def _succeeded(values: dict) -> bool:
+    if values.get("error"):
+        return False
+    return not any(dub.get("error") for dub in (values.get("dubs") or {}).values())
+
+
+def run_resumable(graph, initial_input: dict, job_id: str) -> dict:
+    """
+    Runs a checkpointed graph for a job, resuming a previous run of the same job if there is one.
+
+    Nodes record failures in state['error'] and the remaining nodes skip, so a failed run
+    still reaches the end. To resume, the newest checkpoint taken before anything failed is
+    found and the graph continues from it: only the failed node and the ones after it run again.
+
+    Args:
+        graph: A graph compiled with a checkpointer.
+        initial_input (dict): The input for a fresh run.
+        job_id (str): The job ID, used as the checkpoint thread ID.
+
+    Returns:
+        dict: The final state.
+    """
+    config = {"configurable": {"thread_id": job_id}}
+    latest = graph.get_state(config)
+
+    if not latest.values:
+        return graph.invoke(initial_input, config)
+
+    if not latest.next and _succeeded(latest.values):
+        print(f"Job {job_id} already completed; returning its saved result.")
+        return latest.values
+
+    for snapshot in graph.get_state_history(config):
+        if snapshot.next and _succeeded(snapshot.values):
+            print(f"Resuming job {job_id} at: {', '.join(snapshot.next)}")
+            return graph.invoke(None, snapshot.config)
+
+    # Nothing worth keeping (e.g. the very first node failed): start over
+    print(f"No usable checkpoint for job {job_id}; starting over.")
+    return graph.invoke(initial_input, config)
+
+
+async def _start_async(graph, initial_input: dict, job_id: str) -> tuple:
+    """
+    Decides how a run of a job starts, following the rules of run_resumable.
+
+    Returns:
+        tuple: (graph input, config, None) to start or resume the job with, or
+               (None, None, final state) when it already completed.
+    """
+    config = {"configurable": {"thread_id": job_id}}
+    latest = await graph.aget_state(config)
+
+    if not latest.values:
+        return initial_input, config, None
+
+    if not latest.next and _succeeded(latest.values):
+        print(f"Job {job_id} already completed; returning its saved result.")
+        return None, None, latest.values
+
+    async for snapshot in graph.aget_state_history(config):
+        if snapshot.next and _succeeded(snapshot.values):
+            print(f"Resuming job {job_id} at: {', '.join(snapshot.next)}")
+            return None, snapshot.config, None
+
+    print(f"No usable checkpoint for job {job_id}; starting over.")
+    return initial_input, config, None
+
+
+async def run_resumable_async(graph, initial_input: dict, job_id: str) -> dict:
+    """
+    The async counterpart of run_resumable, for graphs compiled with use_async=True
+    and an async checkpointer.
+
+    Returns:
+        dict: The final state.
+    """
+    graph_input, config, final_state = await _start_async(graph, initial_input, job_id)
+    if final_state is not None:
+        return final_state
+    return await graph.ainvoke(graph_input, config)
+
+
+async def stream_resumable_async(graph, initial_input: dict, job_id: str):
+    """
+    Runs a job like run_resumable_async (or from the start, without a checkpointer)
+    and reports progress while it runs.
+
+    Yields:
+        tuple: (node name, update) after every node, including the nodes of the language
+               branches, then (None, final state) once the graph has finished.
+    """
+    if graph.checkpointer:
+        graph_input, config, final_state = await _start_async(graph, initial_input, job_id)
+        if final_state is not None:
+            yield None, final_state
+            return
+    else:
+        graph_input, config = initial_input, None
+
+    final_state = None
+    async for namespace, mode, chunk in graph.astream(graph_input, config, stream_mode=["updates", "values"],
+                                                      subgraphs=True):
+        if mode == "values":
+            if not namespace:
+                final_state = chunk
+            continue
+        for node, update in chunk.items():
+            yield node, update
+    yield None, final_state
@@ -1,16 +1,78 @@
+import os
+import re
+import asyncio
+import functools
+import threading
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 from src.state import AppState
 from src.nodes.video_processing import process_video_node
-from src.nodes.transcription import transcription_node
-from src.nodes.translation import translation_node
-from src.nodes.synthesis import synthesis_node
+from src.nodes.transcription import transcription_node, transcription_node_async
+from src.nodes.translation import translation_node, translation_node_async
+from src.nodes.synthesis import synthesis_node, synthesis_node_async
+from src.nodes.alignment import alignment_node
 from src.nodes.final_video import final_video_node
+from src.nodes.workspace import workspace_node, cleanup_node
+from src.instrumentation import instrument_node
 
-def create_graph():
+
+def _in_thread(node):
+    """
+    Wraps a synchronous node so that the async graph runs it in a worker thread.
+    """
+    @functools.wraps(node)
+    async def run(state: AppState) -> AppState:
+        return await asyncio.to_thread(node, state)
+    return run
+
+
+def _nodes(use_async: bool, node_wrapper=None) -> dict:
+    """
+    Returns the node implementations by name. The async graph uses coroutine nodes for
+    the API-bound stages and runs the media stages (ffmpeg, yt-dlp) in worker threads.
+    Every node is instrumented (see src.instrumentation). A node_wrapper, if given, is
+    called as node_wrapper(name, node) for every node and returns the function to
+    register instead (e.g. to time each node).
+    """
+    if not use_async:
+        nodes = {
+            "workspace": workspace_node,
+            "video_processor": process_video_node,
+            "transcriber": transcription_node,
+            "translator": translation_node,
+            "synthesizer": synthesis_node,
+            "aligner": alignment_node,
+            "final_video_assembler": final_video_node,
+            "cleanup": cleanup_node,
+        }
+    else:
+        nodes = {
+            "workspace": _in_thread(workspace_node),
+            "video_processor": _in_thread(process_video_node),
+            "transcriber": transcription_node_async,
+            "translator": translation_node_async,
+            "synthesizer": synthesis_node_async,
+            "aligner": _in_thread(alignment_node),
+            "final_video_assembler": _in_thread(final_video_node),
+            "cleanup": _in_thread(cleanup_node),
+        }
+    nodes = {name: instrument_node(name, node) for name, node in nodes.items()}
+    if node_wrapper:
+        nodes = {name: node_wrapper(name, node) for name, node in nodes.items()}
+    return nodes
+
+
+def create_graph(checkpointer=None, use_async=False, node_wrapper=None):
     """
     Creates and compiles the LangGraph for the AI-DubSync application.
+    Pass a checkpointer (see src.checkpoints) to make runs resumable per job.
+
+    With use_async=True the graph is built from async nodes and must be run with
+    'await graph.ainvoke(...)'; one event loop can then drive many jobs at once.
+    node_wrapper is applied to every node (see _nodes).
     """
     print("--- Creating Application Graph ---")
+    nodes = _nodes(use_async, node_wrapper)
     
     # Initialize the graph with our defined state structure
     workflow = StateGraph(AppState)
@@ -20,36 +82,173 @@ def create_graph():
     # The first argument is a unique name for the node.
     # The second argument is the function that implements the node's logic.
     print("Registering nodes...")
-    workflow.add_node("video_processor", process_video_node)
-    workflow.add_node("transcriber", transcription_node)
-    workflow.add_node("translator", translation_node)
-    workflow.add_node("synthesizer", synthesis_node)
-    workflow.add_node("final_video_assembler", final_video_node)
+    workflow.add_node("workspace", nodes["workspace"])
+    workflow.add_node("video_processor", nodes["video_processor"])
+    workflow.add_node("transcriber", nodes["transcriber"])
+    workflow.add_node("translator", nodes["translator"])
+    workflow.add_node("synthesizer", nodes["synthesizer"])
+    workflow.add_node("aligner", nodes["aligner"])
+    workflow.add_node("final_video_assembler", nodes["final_video_assembler"])
+    workflow.add_node("cleanup", nodes["cleanup"])
 
     # --- Define Edges ---
     # This defines the sequence of operations.
     print("Defining workflow edges...")
     
-    # The entry point of the graph is 'video_processor'
-    workflow.set_entry_point("video_processor")
+    # The entry point of the graph is 'workspace', which sets up the job's directories
+    workflow.set_entry_point("workspace")
+    workflow.add_edge("workspace", "video_processor")
     
     # After 'video_processor' completes, the 'transcriber' node should run
     workflow.add_edge("video_processor", "transcriber")
     workflow.add_edge("transcriber", "translator")
     workflow.add_edge("translator", "synthesizer")
-    workflow.add_edge("synthesizer", "final_video_assembler")
+    workflow.add_edge("synthesizer", "aligner")
+    workflow.add_edge("aligner", "final_video_assembler")
     
-    # After 'transcriber' completes, the graph should finish
-    workflow.add_edge("transcriber", END)
+    # After the final video is assembled, intermediates are cleaned up and the graph finishes
+    workflow.add_edge("final_video_assembler", "cleanup")
+    workflow.add_edge("cleanup", END)
 
     # --- Compile the Graph ---
     # This finalizes the graph structure and makes it runnable.
     print("Compiling graph...")
-    app = workflow.compile()
+    app = workflow.compile(checkpointer=checkpointer)
     print("--- Graph Created Successfully ---")
     
     return app
 
-# We can create an instance of the app to be imported elsewhere
-# This line makes it easy to grab the compiled graph from other files.
-app_graph = create_graph()
\ No newline at end of file
+
+def create_language_graph(use_async=False, node_wrapper=None):
+    """
+    Creates the per-language part of the workflow: translation, synthesis, alignment and final assembly.
+    In multi-language mode one instance of this runs for every target language.
+    """
+    nodes = _nodes(use_async, node_wrapper)
+    workflow = StateGraph(AppState)
+    for name in ("translator", "synthesizer", "aligner", "final_video_assembler"):
+        workflow.add_node(name, nodes[name])
+
+    workflow.set_entry_point("translator")
+    workflow.add_edge("translator", "synthesizer")
+    workflow.add_edge("synthesizer", "aligner")
+    workflow.add_edge("aligner", "final_video_assembler")
+    workflow.add_edge("final_video_assembler", END)
+
+    return workflow.compile()
+
+
+def _language_slug(language: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", language.lower()).strip("_") or "language"
+
+
+def fan_out_languages(state: AppState):
+    """
+    Routes the shared transcription to one 'dub_language' branch per target language.
+    Each branch gets its own sub-directories so that branches never overwrite each other.
+    """
+    if state.get("error"):
+        print(f"Skipping dubbing due to a previous error: {state['error']}")
+        return "cleanup"
+
+    languages = state.get("target_languages") or [state.get("target_language")]
+    output_dir = state.get("output_dir", "output")
+    temp_dir = state.get("temp_dir") or output_dir
+    print(f"Fanning out to {len(languages)} language branch(es): {', '.join(languages)}")
+
+    return [
+        Send("dub_language", {
+            "job_id": state.get("job_id"),
+            "youtube_url": state.get("youtube_url"),
+            "original_video_path": state.get("original_video_path"),
+            "original_audio_path": state.get("original_audio_path"),
+            "segments": state.get("segments"),
+            "transcription": state.get("transcription"),
+            "target_language": language,
+            "encoding_profile": state.get("encoding_profile"),
+            "output_dir": os.path.join(output_dir, _language_slug(language)),
+            "temp_dir": os.path.join(temp_dir, _language_slug(language)),
+            "error": None,
+        })
+        for language in languages
+    ]
+
+
+def _dub_outcome(language: str, result: dict) -> dict:
+    # Only report through the 'dubs' reducer; parallel branches must not write shared keys
+    return {"dubs": {language: {
+        "translated_text": result.get("translated_text"),
+        "dubbed_audio_path": result.get("dubbed_audio_path"),
+        "aligned_audio_path": result.get("aligned_audio_path"),
+        "final_video_path": result.get("final_video_path"),
+        "error": result.get("error"),
+    }}}
+
+
+def create_multilang_graph(checkpointer=None, use_async=False, node_wrapper=None):
+    """
+    Creates and compiles the multi-language variant of the workflow.
+
+    The video is downloaded and transcribed once, then every language listed in
+    'target_languages' is translated, synthesized and assembled in a parallel branch.
+    Each branch reports its outcome (or its error) into state['dubs'][language].
+    With use_async=True the graph must be run with 'await graph.ainvoke(...)'.
+    node_wrapper is applied to every node, including those of the language branches.
+    """
+    print("--- Creating Multi-Language Application Graph ---")
+    nodes = _nodes(use_async, node_wrapper)
+    language_graph = create_language_graph(use_async, node_wrapper)
+
+    def dub_language_node(state: AppState) -> dict:
+        language = state["target_language"]
+        print(f"--- BRANCH: Dubbing into {language} ---")
+        return _dub_outcome(language, language_graph.invoke(state))
+
+    async def dub_language_node_async(state: AppState) -> dict:
+        language = state["target_language"]
+        print(f"--- BRANCH: Dubbing into {language} ---")
+        return _dub_outcome(language, await language_graph.ainvoke(state))
+
+    # The branch node itself is not wrapped: its language nodes already are
+    nodes["dub_language"] = dub_language_node_async if use_async else dub_language_node
+
+    workflow = StateGraph(AppState)
+    workflow.add_node("workspace", nodes["workspace"])
+    workflow.add_node("video_processor", nodes["video_processor"])
+    workflow.add_node("transcriber", nodes["transcriber"])
+    workflow.add_node("dub_language", nodes["dub_language"])
+    workflow.add_node("cleanup", nodes["cleanup"])
+
+    workflow.set_entry_point("workspace")
+    workflow.add_edge("workspace", "video_processor")
+    workflow.add_edge("video_processor", "transcriber")
+    workflow.add_conditional_edges("transcriber", fan_out_languages, ["dub_language", "cleanup"])
+    workflow.add_edge("dub_language", "cleanup")
+    workflow.add_edge("cleanup", END)
+
+    app = workflow.compile(checkpointer=checkpointer)
+    print("--- Multi-Language Graph Created Successfully ---")
+
+    return app
+
+_app_graph = None
+_app_graph_lock = threading.Lock()
+
+
+def get_app_graph():
+    """
+    Returns the compiled single-language graph, built on first use and re-used afterwards.
+    Importing this module does not compile anything.
+    """
+    global _app_graph
+    with _app_graph_lock:
+        if _app_graph is None:
+            _app_graph = create_graph()
+    return _app_graph
+
+
+def __getattr__(name):
+    # 'from src.graph import app_graph' keeps working, compiling the graph on first access
+    if name == "app_graph":
+        return get_app_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,188 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+
+from src.metrics import export_metrics, get_metrics
+
+# Default, overridable through LOG_LEVEL (DEBUG, INFO, WARNING or ERROR)
+DEFAULT_LOG_LEVEL = "INFO"
+
+LOGGER_NAME = "ai_dubsync"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a log record as one JSON object per line: the time, level and event name
+    plus every field passed to log_event.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def get_logger() -> logging.Logger:
+    """
+    Returns the structured logger, writing JSON lines to stderr at the LOG_LEVEL threshold.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(os.getenv("LOG_LEVEL", DEFAULT_LOG_LEVEL).upper())
+        logger.propagate = False
+    return logger
+
+
+def log_event(event: str, level: int = logging.INFO, **fields):
+    logger = get_logger()
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={"fields": fields})
+
+
+def record_api_call(service: str, operation: str, response=None, characters: int = 0):
+    """
+    Counts one successful request to an external AI service, with the token usage
+    Gemini reports in response.usage_metadata and the characters sent to Text-to-Speech.
+    """
+    metrics = get_metrics()
+    metrics.inc("dubsync_api_calls_total", service=service, operation=operation)
+    usage = getattr(response, "usage_metadata", None)
+    input_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    if input_tokens:
+        metrics.inc("dubsync_api_tokens_total", input_tokens, service=service, kind="input")
+    if output_tokens:
+        metrics.inc("dubsync_api_tokens_total", output_tokens, service=service, kind="output")
+    if characters:
+        metrics.inc("dubsync_tts_characters_total", characters, service=service)
+    log_event("api_call", logging.DEBUG, service=service, operation=operation,
+              input_tokens=input_tokens, output_tokens=output_tokens, characters=characters)
+
+
+def record_retry(stage: str | None, tool_name: str, attempt: int, attempts: int, will_retry: bool):
+    """
+    Counts a failed attempt of a tool call and, if another attempt follows, the retry.
+    """
+    metrics = get_metrics()
+    metrics.inc("dubsync_tool_failures_total", stage=stage or "", tool=tool_name)
+    if will_retry:
+        metrics.inc("dubsync_retries_total", stage=stage or "", tool=tool_name)
+    log_event("tool_failed", logging.WARNING, stage=stage, tool=tool_name, attempt=attempt,
+              attempts=attempts, will_retry=will_retry)
+
+
+def _file_size(path: str | None) -> int:
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+def _output_sizes(name: str, state: dict) -> dict:
+    """
+    Measures what a node produced, as {metric name: amount}.
+    """
+    if name == "video_processor" and state.get("original_audio_path"):
+        from src.tools.media_tools import get_media_duration
+        duration = get_media_duration(state["original_audio_path"])
+        return {"dubsync_audio_seconds_total": duration} if duration else {}
+    if name == "transcriber":
+        return {"dubsync_transcript_chars_total": len(state.get("transcription") or "")}
+    if name == "translator":
+        return {"dubsync_translated_chars_total": len(state.get("translated_text") or "")}
+    if name == "synthesizer":
+        segments = state.get("dubbed_segments") or []
+        size = sum(_file_size(segment["path"]) for segment in segments)
+        return {"dubsync_tts_bytes_total": size or _file_size(state.get("dubbed_audio_path"))}
+    if name == "final_video_assembler":
+        return {"dubsync_output_bytes_total": _file_size(state.get("final_video_path"))}
+    return {}
+
+
+def _finish(name: str, state: dict, result, had_error: bool, started: float, failure: Exception | None = None):
+    duration = time.perf_counter() - started
+    result = result if isinstance(result, dict) else {}
+    if failure is not None:
+        status = "exception"
+    elif had_error:
+        status = "skipped"
+    elif result.get("error"):
+        status = "error"
+    else:
+        status = "ok"
+
+    language = state.get("target_language") if name in ("translator", "synthesizer", "aligner",
+                                                        "final_video_assembler") else None
+    sizes = {}
+    if status == "ok":
+        try:
+            sizes = {metric: amount for metric, amount in _output_sizes(name, result).items() if amount}
+        except Exception as e:
+            log_event("metrics_failed", logging.WARNING, node=name, error=str(e))
+
+    metrics = get_metrics()
+    metrics.observe("dubsync_node_duration_seconds", duration, node=name, status=status)
+    for metric, amount in sizes.items():
+        metrics.inc(metric, amount, **({"language": language} if language else {}))
+
+    fields = {
+        "job_id": state.get("job_id"),
+        "node": name,
+        "language": language,
+        "status": status,
+        "duration_s": round(duration, 3),
+        **{metric.removeprefix("dubsync_").removesuffix("_total"): round(amount, 3) for metric, amount in sizes.items()},
+    }
+    if status in ("error", "exception"):
+        fields["error"] = str(failure) if failure is not None else result.get("error")
+    log_event("node_finished", logging.ERROR if status in ("error", "exception") else logging.INFO, **fields)
+
+    try:
+        export_metrics()
+    except OSError as e:
+        log_event("metrics_export_failed", logging.WARNING, error=str(e))
+
+
+def instrument_node(name: str, node):
+    """
+    Wraps a graph node (sync or async) so that every run logs a structured
+    'node_finished' event and updates the metrics: latency per node and status,
+    and the size of what the node produced (audio seconds, transcript and
+    translation characters, TTS and video bytes). The metrics are written to
+    METRICS_FILE after every node. For async nodes this bookkeeping (which may probe
+    media files and writes the metrics file) runs in a worker thread, off the event loop.
+    """
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def run_async(state):
+            had_error = bool(state.get("error"))
+            started = time.perf_counter()
+            try:
+                result = await node(state)
+            except Exception as e:
+                await asyncio.to_thread(_finish, name, state, None, had_error, started, e)
+                raise
+            await asyncio.to_thread(_finish, name, state, result, had_error, started)
+            return result
+        return run_async
+
+    @functools.wraps(node)
+    def run(state):
+        had_error = bool(state.get("error"))
+        started = time.perf_counter()
+        try:
+            result = node(state)
+        except Exception as e:
+            _finish(name, state, None, had_error, started, e)
+            raise
+        _finish(name, state, result, had_error, started)
+        return result
+    return run
@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+import time
+from src.tools.cache import hash_text
+from src.tools.sqlite_util import connect, connection
+
+# Default, overridable through JOB_QUEUE_PATH
+DEFAULT_QUEUE_PATH = "./jobs.db"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def job_id_for(youtube_url: str, target_languages: list, encoding_profile: str | None = None) -> str:
+    """
+    Derives a job ID from the URL and the target languages (and the encoding profile,
+    if one is chosen), so the same job always gets the same ID.
+    """
+    if encoding_profile:
+        return hash_text("job", youtube_url.strip(), list(target_languages), encoding_profile)[:12]
+    return hash_text("job", youtube_url.strip(), list(target_languages))[:12]
+
+
+class JobQueue:
+    """
+    A persistent job queue stored in a local SQLite database.
+
+    Every state change is committed immediately, so after a crash the queue knows which
+    jobs finished; jobs that were running are put back to pending by requeue_interrupted().
+    The database is safe to share between the threads and processes of one host.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("JOB_QUEUE_PATH", DEFAULT_QUEUE_PATH)
+        with connection(self.path, sqlite3.Row) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    youtube_url TEXT NOT NULL,
+                    target_languages TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            # Queues created before jobs could choose an encoding profile lack the column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "encoding_profile" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN encoding_profile TEXT")
+
+    def add(self, youtube_url: str, target_languages: list, encoding_profile: str | None = None) -> str:
+        """
+        Adds a job unless the same URL and languages (and encoding profile) are already queued.
+        The job ID is derived from them, so re-submitting a manifest is idempotent.
+        Without an encoding profile, the job uses ENCODING_PROFILE.
+
+        Returns:
+            str: The job ID.
+        """
+        job_id = job_id_for(youtube_url, target_languages, encoding_profile)
+        with connection(self.path, sqlite3.Row) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, youtube_url, target_languages, encoding_profile, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, youtube_url.strip(), json.dumps(list(target_languages)), encoding_profile, PENDING, time.time()),
+            )
+        return job_id
+
+    def claim(self) -> dict | None:
+        """
+        Atomically takes the oldest pending job and marks it as running.
+
+        Returns:
+            dict: The job, or None when no job is pending.
+        """
+        conn = connect(self.path, sqlite3.Row)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (PENDING,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, error = NULL WHERE job_id = ?",
+                (RUNNING, time.time(), row["job_id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        job = dict(row)
+        job["target_languages"] = json.loads(job["target_languages"])
+        return job
+
+    def complete(self, job_id: str, result: dict):
+        """
+        Marks a job as done and stores its result.
+        """
+        self._finish(job_id, DONE, None, result)
+
+    def fail(self, job_id: str, error: str, result: dict | None = None):
+        """
+        Marks a job as failed with its error message.
+        """
+        self._finish(job_id, FAILED, error, result)
+
+    def _finish(self, job_id: str, status: str, error: str | None, result: dict | None):
+        with connection(self.path, sqlite3.Row) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, result = ?, finished_at = ? WHERE job_id = ?",
+                (status, error, json.dumps(result, ensure_ascii=False) if result else None, time.time(), job_id),
+            )
+
+    def requeue_interrupted(self) -> int:
+        """
+        Puts jobs left 'running' by a crashed run back to pending.
+
+        Returns:
+            int: The number of jobs requeued.
+        """
+        with connection(self.path, sqlite3.Row) as conn:
+            return conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (PENDING, RUNNING)).rowcount
+
+    def requeue_failed(self) -> int:
+        """
+        Puts failed jobs back to pending so they are retried.
+
+        Returns:
+            int: The number of jobs requeued.
+        """
+        with connection(self.path, sqlite3.Row) as conn:
+            return conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (PENDING, FAILED)).rowcount
+
+    def counts(self) -> dict:
+        """
+        Returns the number of jobs per status.
+        """
+        with connection(self.path, sqlite3.Row) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
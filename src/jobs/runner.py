@@ -0,0 +1,291 @@
+import asyncio
+import csv
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from src.jobs.queue import JobQueue
+from src.graph import create_graph, create_multilang_graph
+from src.checkpoints import get_checkpointer, run_resumable, async_checkpointer, run_resumable_async
+from src.tools.video_encoding import get_encoding_profile
+
+# Default, overridable through BATCH_WORKERS
+DEFAULT_WORKERS = 2
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def read_manifest(path: str) -> list:
+    """
+    Reads a batch manifest of videos and the languages to dub them into.
+
+    JSONL: one object per line, e.g. {"url": "...", "languages": ["Turkish", "Spanish"]}
+           ("language" with a single string is accepted too).
+    CSV:   a header with 'url' and 'languages', languages separated by ';' or '|'.
+    Either may also give an 'encoding_profile' per video.
+
+    Returns:
+        list: (url, [languages], encoding profile or None) tuples.
+
+    Raises:
+        ValueError: If an entry names an unknown encoding profile.
+    """
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(f):
+                languages = row.get("languages") or row.get("language") or ""
+                languages = [lang.strip() for lang in languages.replace("|", ";").split(";") if lang.strip()]
+                entries.append((row["url"].strip(), languages, (row.get("encoding_profile") or "").strip() or None))
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                languages = item.get("languages") or [item.get("language")]
+                entries.append((item["url"], [lang for lang in languages if lang], item.get("encoding_profile")))
+
+    for _, _, encoding_profile in entries:
+        if encoding_profile:
+            get_encoding_profile(encoding_profile)
+    default_language = os.getenv("DEFAULT_TARGET_LANGUAGE", "Turkish")
+    return [(url, languages or [default_language], encoding_profile) for url, languages, encoding_profile in entries]
+
+
+def _graph_for(languages: list):
+    """
+    Returns the compiled graph for a job, built once per process and shared by its threads.
+    """
+    kind = "single" if len(languages) == 1 else "multi"
+    with _graphs_lock:
+        if kind not in _graphs:
+            checkpointer = get_checkpointer()
+            _graphs[kind] = create_graph(checkpointer) if kind == "single" else create_multilang_graph(checkpointer)
+    return _graphs[kind]
+
+
+def run_job(job: dict) -> dict:
+    """
+    Runs the dubbing workflow for one queued job, in the workspace named after its job ID.
+    With checkpoints enabled, a job that failed or was interrupted before continues
+    from its last successful node instead of starting over.
+
+    Returns:
+        dict: {'error': message or None, 'result': {language: outcome}}.
+    """
+    try:
+        graph = _graph_for(job["target_languages"])
+        if graph.checkpointer:
+            final_state = run_resumable(graph, job_input(job), job["job_id"])
+        else:
+            final_state = graph.invoke(job_input(job))
+    except Exception as e:
+        return {"error": f"Unexpected error while running the workflow: {e}", "result": {}}
+    return job_outcome(job, final_state)
+
+
+async def run_job_async(job: dict, graphs: dict) -> dict:
+    """
+    The async counterpart of run_job, on graphs compiled with use_async=True.
+
+    Args:
+        job (dict): The queued job.
+        graphs (dict): {'single': graph, 'multi': graph}.
+
+    Returns:
+        dict: {'error': message or None, 'result': {language: outcome}}.
+    """
+    try:
+        graph = graphs["single" if len(job["target_languages"]) == 1 else "multi"]
+        if graph.checkpointer:
+            final_state = await run_resumable_async(graph, job_input(job), job["job_id"])
+        else:
+            final_state = await graph.ainvoke(job_input(job))
+    except Exception as e:
+        return {"error": f"Unexpected error while running the workflow: {e}", "result": {}}
+    return job_outcome(job, final_state)
+
+
+def job_input(job: dict) -> dict:
+    """
+    Returns the initial graph input of a job.
+    """
+    languages = job["target_languages"]
+    return {
+        "job_id": job["job_id"],
+        "youtube_url": job["youtube_url"],
+        "target_language": languages[0],
+        "target_languages": languages,
+        "encoding_profile": job.get("encoding_profile"),
+        "error": None,
+    }
+
+
+def job_outcome(job: dict, final_state: dict) -> dict:
+    """
+    Summarizes a final state as {'error': message or None, 'result': {language: outcome}}.
+    """
+    languages = job["target_languages"]
+    if len(languages) == 1:
+        outcomes = {languages[0]: {
+            "final_video_path": final_state.get("final_video_path"),
+            "error": final_state.get("error"),
+        }}
+    else:
+        outcomes = {language: {"final_video_path": dub.get("final_video_path"), "error": dub.get("error")}
+                    for language, dub in (final_state.get("dubs") or {}).items()}
+
+    errors = [f"{language}: {outcome['error']}" for language, outcome in outcomes.items() if outcome.get("error")]
+    error = final_state.get("error") or ("; ".join(errors) if errors else None)
+    return {"error": error, "result": outcomes}
+
+
+def worker_loop(queue_path: str) -> list:
+    """
+    Claims and runs jobs until the queue has no pending job left.
+    Used as the body of every thread or process in the pool.
+
+    Returns:
+        list: (status, seconds) for every job this worker ran.
+    """
+    queue = JobQueue(queue_path)
+    finished = []
+    while True:
+        job = queue.claim()
+        if job is None:
+            return finished
+
+        print(f"Batch: Starting job {job['job_id']} ({job['youtube_url']} -> {', '.join(job['target_languages'])})")
+        started = time.monotonic()
+        outcome = run_job(job)
+        finished.append(_record(queue, job, outcome, time.monotonic() - started))
+
+
+async def worker_loop_async(queue_path: str, graphs: dict) -> list:
+    """
+    The async counterpart of worker_loop. Many of these run as coroutines on one
+    event loop; queue access runs in worker threads so it never blocks the loop.
+
+    Returns:
+        list: (status, seconds) for every job this worker ran.
+    """
+    queue = JobQueue(queue_path)
+    finished = []
+    while True:
+        job = await asyncio.to_thread(queue.claim)
+        if job is None:
+            return finished
+
+        print(f"Batch: Starting job {job['job_id']} ({job['youtube_url']} -> {', '.join(job['target_languages'])})")
+        started = time.monotonic()
+        outcome = await run_job_async(job, graphs)
+        finished.append(await asyncio.to_thread(_record, queue, job, outcome, time.monotonic() - started))
+
+
+def _record(queue: JobQueue, job: dict, outcome: dict, elapsed: float) -> tuple:
+    """
+    Stores the outcome of a job in the queue.
+
+    Returns:
+        tuple: (status, seconds).
+    """
+    if outcome["error"]:
+        queue.fail(job["job_id"], outcome["error"], outcome["result"])
+        print(f"Batch: Job {job['job_id']} failed after {elapsed:.0f}s: {outcome['error']}")
+        return ("failed", elapsed)
+    queue.complete(job["job_id"], outcome["result"])
+    print(f"Batch: Job {job['job_id']} done in {elapsed:.0f}s. Queue: {queue.counts()}")
+    return ("done", elapsed)
+
+
+@asynccontextmanager
+async def async_graphs(workers: int):
+    """
+    Sets up the running event loop for async jobs: sizes its default executor for the given
+    number of concurrent jobs, opens the async checkpointer and compiles the async graphs.
+
+    Yields:
+        dict: {"single": graph, "multi": graph}, both compiled with use_async=True.
+    """
+    # The media stages of every job run in worker threads; give each concurrent job one
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=workers + (os.cpu_count() or 1))
+    )
+    async with async_checkpointer() as checkpointer:
+        yield {
+            "single": create_graph(checkpointer, use_async=True),
+            "multi": create_multilang_graph(checkpointer, use_async=True),
+        }
+
+
+async def _run_async_workers(queue_path: str, workers: int) -> list:
+    async with async_graphs(workers) as graphs:
+        results = await asyncio.gather(*(worker_loop_async(queue_path, graphs) for _ in range(workers)))
+    return [entry for result in results for entry in result]
+
+
+def run_batch(manifest_path: str | None = None, workers: int | None = None, use_processes: bool = False,
+              queue_path: str | None = None, retry_failed: bool = False, use_async: bool = False,
+              encoding_profile: str | None = None) -> dict:
+    """
+    Runs every pending job of the persistent queue on a pool of workers.
+
+    Jobs from the manifest are added to the queue first (already-known jobs are skipped),
+    and jobs left running by a crashed run are resumed. Each worker is a thread, or a
+    separate process with use_processes=True; MEDIA_CONCURRENCY and API_CONCURRENCY then
+    bound the CPU-bound and I/O-bound stages inside each process.
+
+    With use_async=True every worker is a coroutine on a single event loop running the
+    async graph instead, so one process can keep dozens of jobs in flight.
+
+    encoding_profile applies to the manifest entries that do not name one.
+
+    Returns:
+        dict: Run statistics, including throughput in jobs per hour.
+
+    Raises:
+        ValueError: If the encoding profile, or one in the manifest, is unknown.
+    """
+    workers = workers or int(os.getenv("BATCH_WORKERS", DEFAULT_WORKERS))
+    # A bad profile (given or from ENCODING_PROFILE) stops the run before any job starts
+    get_encoding_profile(encoding_profile)
+    queue = JobQueue(queue_path)
+
+    if manifest_path:
+        entries = read_manifest(manifest_path)
+        for url, languages, entry_profile in entries:
+            queue.add(url, languages, entry_profile or encoding_profile)
+        print(f"Batch: {len(entries)} manifest entry(ies) queued.")
+
+    resumed = queue.requeue_interrupted()
+    if resumed:
+        print(f"Batch: Resuming {resumed} job(s) interrupted by a previous run.")
+    if retry_failed:
+        print(f"Batch: Retrying {queue.requeue_failed()} failed job(s).")
+
+    kind = "async" if use_async else "process" if use_processes else "thread"
+    print(f"Batch: Running with {workers} {kind} worker(s). Queue: {queue.counts()}")
+    started = time.monotonic()
+
+    if use_async:
+        finished = asyncio.run(_run_async_workers(queue.path, workers))
+    else:
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_class(max_workers=workers) as pool:
+            futures = [pool.submit(worker_loop, queue.path) for _ in range(workers)]
+            finished = [entry for future in futures for entry in future.result()]
+
+    elapsed = time.monotonic() - started
+    done = [seconds for status, seconds in finished if status == "done"]
+    stats = {
+        "jobs_done": len(done),
+        "jobs_failed": len(finished) - len(done),
+        "wall_seconds": round(elapsed, 1),
+        "jobs_per_hour": round(len(finished) / elapsed * 3600, 2) if elapsed > 0 else 0.0,
+        "average_job_seconds": round(sum(s for _, s in finished) / len(finished), 1) if finished else 0.0,
+        "queue": queue.counts(),
+    }
+    return stats
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from aiohttp import web
+from src.checkpoints import stream_resumable_async
+from src.jobs.queue import job_id_for
+from src.jobs.runner import async_graphs, job_input, job_outcome
+from src.metrics import get_metrics
+from src.tools.video_encoding import ENCODING_PROFILES, get_encoding_profile
+
+# Defaults, overridable through SERVICE_HOST / SERVICE_PORT / SERVICE_WORKERS /
+# SERVICE_QUEUE_SIZE / SERVICE_KEEP_JOBS
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_KEEP_JOBS = 1000
+
+# Seconds between keep-alive comments on idle event streams, and the Retry-After of a 429
+KEEPALIVE_SECONDS = 15
+RETRY_AFTER_SECONDS = 30
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+LANGUAGE_NODES = ("translator", "synthesizer", "aligner", "final_video_assembler")
+
+
+def _progress(node: str, update) -> dict:
+    """
+    Condenses a node's state update into a progress event: the node, the language
+    branch it ran in and its error, if any.
+    """
+    update = update if isinstance(update, dict) else {}
+    if node == "dub_language":
+        language, dub = next(iter((update.get("dubs") or {}).items()), (None, {}))
+        return {"node": node, "language": language, "error": dub.get("error")}
+    event = {"node": node, "error": update.get("error")}
+    if node in LANGUAGE_NODES:
+        event["language"] = update.get("target_language")
+    return event
+
+
+class DubService:
+    """
+    The HTTP front-end of the dubber. Submitted jobs are admitted into a bounded queue
+    and run by a fixed number of workers on the async graph; when the queue is full,
+    submissions are rejected with 429 instead of piling up on the host.
+
+    Every job keeps a log of events (queued, started, one per finished node, done or
+    failed) that clients follow as Server-Sent Events. Jobs are checkpointed under their
+    job ID, so re-submitting a job that failed or was interrupted resumes it.
+
+    Routes:
+        POST /jobs                {"url": ..., "languages": [...], "encoding_profile": ...}
+                                  -> 202 with the job ID; the profile is optional
+        GET  /jobs/{job_id}       The job's status and result.
+        GET  /jobs/{job_id}/events  The job's progress as a text/event-stream.
+        GET  /health              Queue and worker usage.
+        GET  /metrics             The Prometheus metrics of this process.
+    """
+
+    def __init__(self, workers: int | None = None, queue_size: int | None = None, keep_jobs: int | None = None):
+        self.workers = workers or int(os.getenv("SERVICE_WORKERS", DEFAULT_WORKERS))
+        self.queue_size = queue_size or int(os.getenv("SERVICE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+        self.keep_jobs = keep_jobs or int(os.getenv("SERVICE_KEEP_JOBS", DEFAULT_KEEP_JOBS))
+        # Refuse to start with a bad ENCODING_PROFILE rather than fail every job
+        get_encoding_profile()
+        self.jobs = OrderedDict()
+        self.queue = None
+        self.graphs = {}
+        self._tasks = []
+
+    # --- Lifecycle ---
+
+    async def lifecycle(self, app: web.Application):
+        """
+        aiohttp cleanup context: compiles the graphs and starts the workers with the
+        application, and stops them when it shuts down.
+        """
+        async with async_graphs(self.workers) as graphs:
+            self.graphs = graphs
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+            print(f"Service: {self.workers} worker(s), room for {self.queue_size} queued job(s).")
+            yield
+            # Running jobs are interrupted; with checkpoints, re-submitting them resumes them
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # --- Jobs ---
+
+    def _emit(self, job: dict, event: str, **data):
+        job["events"].append({"event": event, "time": time.time(), **data})
+        job["changed"].set()
+        # Wake the current listeners and give the next ones a fresh flag
+        job["changed"] = asyncio.Event()
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] in (DONE, FAILED)]
+        for job_id in finished[:max(0, len(self.jobs) - self.keep_jobs)]:
+            del self.jobs[job_id]
+
+    def submit(self, youtube_url: str, target_languages: list, encoding_profile: str | None = None) -> tuple:
+        """
+        Admits a job into the queue. A job that is already queued or running is not added twice.
+
+        Returns:
+            tuple: (job, accepted); accepted is False when the queue is full.
+        """
+        job_id = job_id_for(youtube_url, target_languages, encoding_profile)
+        job = self.jobs.get(job_id)
+        if job and job["status"] in (QUEUED, RUNNING):
+            return job, True
+        if self.queue.full():
+            get_metrics().inc("dubsync_service_jobs_total", result="rejected")
+            return job, False
+
+        job = {
+            "job_id": job_id,
+            "youtube_url": youtube_url.strip(),
+            "target_languages": list(target_languages),
+            "encoding_profile": encoding_profile,
+            "status": QUEUED,
+            "error": None,
+            "result": None,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "events": [],
+            "changed": asyncio.Event(),
+        }
+        self.jobs.pop(job_id, None)
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job_id)
+        self._emit(job, "queued", position=self.queue.qsize())
+        get_metrics().inc("dubsync_service_jobs_total", result="accepted")
+        self._forget_old_jobs()
+        return job, True
+
+    async def _worker(self):
+        while True:
+            job = self.jobs.get(await self.queue.get())
+            try:
+                if job is not None:
+                    await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: dict):
+        print(f"Service: Starting job {job['job_id']} ({job['youtube_url']} -> {', '.join(job['target_languages'])})")
+        job["status"] = RUNNING
+        job["started_at"] = time.time()
+        self._emit(job, "started")
+
+        graph = self.graphs["single" if len(job["target_languages"]) == 1 else "multi"]
+        try:
+            final_state = {}
+            async for node, update in stream_resumable_async(graph, job_input(job), job["job_id"]):
+                if node is None:
+                    final_state = update or {}
+                else:
+                    self._emit(job, "node", **_progress(node, update))
+            outcome = job_outcome(job, final_state)
+        except asyncio.CancelledError:
+            self._finish(job, {"error": "Interrupted by a service shutdown.", "result": {}})
+            raise
+        except Exception as e:
+            outcome = {"error": f"Unexpected error while running the workflow: {e}", "result": {}}
+        self._finish(job, outcome)
+
+    def _finish(self, job: dict, outcome: dict):
+        job["status"] = FAILED if outcome["error"] else DONE
+        job["error"] = outcome["error"]
+        job["result"] = outcome["result"]
+        job["finished_at"] = time.time()
+        self._emit(job, job["status"], error=job["error"], result=job["result"])
+        get_metrics().inc("dubsync_service_jobs_total", result=job["status"])
+        elapsed = job["finished_at"] - job["started_at"]
+        if job["error"]:
+            print(f"Service: Job {job['job_id']} failed after {elapsed:.0f}s: {job['error']}")
+        else:
+            print(f"Service: Job {job['job_id']} done in {elapsed:.0f}s.")
+
+    # --- Handlers ---
+
+    @staticmethod
+    def _describe(job: dict) -> dict:
+        return {key: value for key, value in job.items() if key not in ("events", "changed")} | {
+            "progress": next((event for event in reversed(job["events"]) if event["event"] == "node"), None),
+            "status_url": f"/jobs/{job['job_id']}",
+            "events_url": f"/jobs/{job['job_id']}/events",
+        }
+
+    async def handle_submit(self, request: web.Request) -> web.Response:
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return web.json_response({"error": "The request body must be a JSON object."}, status=400)
+        if not isinstance(body, dict) or not isinstance(body.get("url"), str) or not body["url"].strip():
+            return web.json_response({"error": "'url' is required."}, status=400)
+        # Local sources are for the CLI and batch runs only: a client must not read the server's disk
+        url = urlparse(body["url"].strip())
+        if url.scheme not in ("http", "https") or not url.netloc:
+            return web.json_response({"error": "'url' must be an http(s):// URL."}, status=400)
+
+        languages = body.get("languages") or [body.get("language") or os.getenv("DEFAULT_TARGET_LANGUAGE", "Turkish")]
+        if not isinstance(languages, list) or not all(isinstance(lang, str) and lang.strip() for lang in languages):
+            return web.json_response({"error": "'languages' must be a list of language names."}, status=400)
+
+        encoding_profile = body.get("encoding_profile")
+        if isinstance(encoding_profile, str):
+            encoding_profile = encoding_profile.strip().lower()
+        if encoding_profile is not None and (not isinstance(encoding_profile, str)
+                                             or encoding_profile not in ENCODING_PROFILES):
+            return web.json_response(
+                {"error": f"'encoding_profile' must be one of: {', '.join(ENCODING_PROFILES)}."}, status=400,
+            )
+
+        job, accepted = self.submit(body["url"].strip(), [lang.strip() for lang in languages], encoding_profile)
+        if not accepted:
+            return web.json_response(
+                {"error": f"The service is at capacity ({self.queue_size} job(s) queued); retry later."},
+                status=429, headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+        return web.json_response(self._describe(job), status=202,
+                                 headers={"Location": f"/jobs/{job['job_id']}"})
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            return web.json_response({"error": "Unknown job."}, status=404)
+        return web.json_response(self._describe(job))
+
+    async def handle_events(self, request: web.Request) -> web.StreamResponse:
+        """
+        Streams a job's events, starting with the ones it already has. A client that
+        reconnects with Last-Event-ID continues after the last event it received.
+        """
+        job = self.jobs.get(request.match_info["job_id"])
+        if job is None:
+            return web.json_response({"error": "Unknown job."}, status=404)
+
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
+        await response.prepare(request)
+
+        last_id = request.headers.get("Last-Event-ID", "")
+        sent = int(last_id) + 1 if last_id.isdigit() else 0
+        while True:
+            changed = job["changed"]
+            while sent < len(job["events"]):
+                event = job["events"][sent]
+                data = json.dumps({"job_id": job["job_id"], **event}, ensure_ascii=False, default=str)
+                await response.write(f"id: {sent}\nevent: {event['event']}\ndata: {data}\n\n".encode("utf-8"))
+                sent += 1
+            if job["status"] in (DONE, FAILED):
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                await response.write(b": keep-alive\n\n")
+
+        await response.write_eof()
+        return response
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        running = sum(1 for job in self.jobs.values() if job["status"] == RUNNING)
+        return web.json_response({
+            "status": "ok",
+            "workers": self.workers,
+            "running": running,
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue_size,
+        })
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=get_metrics().render(), content_type="text/plain", charset="utf-8")
+
+
+def create_app(service: DubService | None = None) -> web.Application:
+    """
+    Creates the aiohttp application of the dubbing service (see DubService).
+    """
+    service = service or DubService()
+    app = web.Application()
+    app.cleanup_ctx.append(service.lifecycle)
+    app.router.add_post("/jobs", service.handle_submit)
+    app.router.add_get("/jobs/{job_id}", service.handle_status)
+    app.router.add_get("/jobs/{job_id}/events", service.handle_events)
+    app.router.add_get("/health", service.handle_health)
+    app.router.add_get("/metrics", service.handle_metrics)
+    return app
+
+
+def run_service(host: str | None = None, port: int | None = None, workers: int | None = None,
+                queue_size: int | None = None):
+    """
+    Serves the dubbing API until interrupted.
+    """
+    host = host or os.getenv("SERVICE_HOST", DEFAULT_HOST)
+    port = port or int(os.getenv("SERVICE_PORT", DEFAULT_PORT))
+    web.run_app(create_app(DubService(workers, queue_size)), host=host, port=port, print=print)
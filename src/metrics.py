@@ -0,0 +1,157 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds of the duration histogram buckets, in seconds
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+# Every metric with its type and help text, in the order they are exported
+METRICS = {
+    "dubsync_node_duration_seconds": ("histogram", "Time spent in each graph node."),
+    "dubsync_audio_seconds_total": ("counter", "Seconds of source audio processed."),
+    "dubsync_transcript_chars_total": ("counter", "Characters of transcript produced."),
+    "dubsync_translated_chars_total": ("counter", "Characters of translated text produced."),
+    "dubsync_tts_bytes_total": ("counter", "Bytes of synthesized speech produced."),
+    "dubsync_output_bytes_total": ("counter", "Bytes of final videos written."),
+    "dubsync_api_calls_total": ("counter", "Successful requests to external AI services."),
+    "dubsync_api_tokens_total": ("counter", "Gemini tokens used, by kind (input or output)."),
+    "dubsync_tts_characters_total": ("counter", "Characters sent to Text-to-Speech (the billing unit)."),
+    "dubsync_translation_memory_segments_total": ("counter", "Segments looked up in the translation memory, by result."),
+    "dubsync_tts_clips_total": ("counter", "Sentence clips of the dubbed tracks, by source (synthesized, cache or repeated)."),
+    "dubsync_service_jobs_total": ("counter", "Jobs submitted to the HTTP service, by result (accepted, rejected, done or failed)."),
+    "dubsync_tool_failures_total": ("counter", "Failed attempts of AI tool calls."),
+    "dubsync_retries_total": ("counter", "Retries of failed AI tool calls."),
+}
+
+
+def _label_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsRegistry:
+    """
+    A small thread-safe store of counters and histograms that renders itself in the
+    Prometheus text format, so it can be scraped or picked up as a textfile.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """
+        Adds value to a counter.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Records one observation in a histogram.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.setdefault(key, {"buckets": [0] * len(DURATION_BUCKETS), "sum": 0.0, "count": 0})
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def render(self) -> str:
+        """
+        Returns all metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: {**value, "buckets": list(value["buckets"])} for key, value in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            series = [(key, value) for key, value in (histograms if kind == "histogram" else counters).items()
+                      if key[0] == name]
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (_, labels), value in sorted(series):
+                if kind == "counter":
+                    lines.append(f"{name}{_label_text(labels)} {value:g}")
+                    continue
+                for bound, count in zip(DURATION_BUCKETS, value["buckets"]):
+                    lines.append(f"{name}_bucket{_label_text(labels + (('le', f'{bound:g}'),))} {count}")
+                lines.append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{name}_sum{_label_text(labels)} {value['sum']:.6f}")
+                lines.append(f"{name}_count{_label_text(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path: str):
+        """
+        Writes the metrics to a file atomically, e.g. for node_exporter's textfile collector.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        partial_path = f"{path}.{os.getpid()}.tmp"
+        with open(partial_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(partial_path, path)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def _serve(registry: MetricsRegistry, port: int):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    except OSError as e:
+        # e.g. another worker process already serves this port
+        print(f"Metrics: Could not serve metrics on port {port}: {e}")
+        return
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    print(f"Metrics: Serving Prometheus metrics on http://0.0.0.0:{port}/metrics")
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Returns the process-wide metrics registry. When METRICS_PORT is set, the first
+    call also starts an HTTP endpoint serving /metrics.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+            port = os.getenv("METRICS_PORT")
+            if port:
+                _serve(_registry, int(port))
+    return _registry
+
+
+def export_metrics():
+    """
+    Writes the metrics to METRICS_FILE, if set. A '{pid}' in the file name is replaced
+    by the process ID, so every batch worker process can write its own file.
+    """
+    path = os.getenv("METRICS_FILE")
+    if path:
+        get_metrics().write_file(path.replace("{pid}", str(os.getpid())))
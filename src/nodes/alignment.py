@@ -0,0 +1,40 @@
+import os
+from src.state import AppState
+from src.tools.audio_alignment import align_dubbed_segments
+
+def alignment_node(state: AppState) -> AppState:
+    """
+    The node responsible for laying every synthesized segment at the timestamp of its
+    source segment, so the dubbed speech stays in sync with the picture.
+    It uses the audio_alignment tool for the actual work.
+
+    Args:
+        state (AppState): The current application state.
+
+    Returns:
+        AppState: The updated state with the aligned audio track.
+    """
+    print("--- NODE: Aligning Dubbed Audio ---")
+
+    if state.get("error"):
+        print(f"Skipping alignment due to a previous error: {state['error']}")
+        return state
+
+    dubbed_segments = state.get("dubbed_segments")
+    reference_audio_path = state.get("original_audio_path")
+    if not dubbed_segments or not reference_audio_path:
+        state["error"] = "Dubbed segments or original audio path not found in state."
+        return state
+
+    output_dir = state.get("temp_dir") or state.get("output_dir", "output")
+    aligned_audio_path = os.path.join(output_dir, "dubbed_aligned.m4a")
+
+    result = align_dubbed_segments(dubbed_segments, reference_audio_path, output_dir, aligned_audio_path)
+
+    if "error" in result:
+        state["error"] = result["error"]
+    else:
+        state["aligned_audio_path"] = result["aligned_audio_path"]
+        print("Alignment successful.")
+
+    return state
@@ -1,6 +1,6 @@
 import os
 from src.state import AppState
-from src.tools.media_tools import combine_video_and_audio
+from src.tools.media_tools import combine_video_and_audio, wait_for_video
 
 def final_video_node(state: AppState) -> AppState:
     """
@@ -13,16 +13,24 @@ def final_video_node(state: AppState) -> AppState:
         return state
 
     video_path = state.get("original_video_path")
-    audio_path = state.get("dubbed_audio_path")
+    # Prefer the timing-aligned track; fall back to the plain concatenated speech
+    audio_path = state.get("aligned_audio_path") or state.get("dubbed_audio_path")
 
     if not video_path or not audio_path:
         state["error"] = "Original video or dubbed audio path not found in state."
         return state
 
-    output_dir = "output"
+    # The video stream may still be downloading in the background
+    video_result = wait_for_video(video_path, state.get("youtube_url"))
+    if "error" in video_result:
+        state["error"] = video_result["error"]
+        return state
+
+    output_dir = state.get("output_dir", "output")
+    os.makedirs(output_dir, exist_ok=True)
     final_video_path = os.path.join(output_dir, "AI_DubSync_FINAL.mp4")
     
-    result = combine_video_and_audio(video_path, audio_path, final_video_path)
+    result = combine_video_and_audio(video_path, audio_path, final_video_path, state.get("encoding_profile"))
 
     if "error" in result:
         state["error"] = result["error"]
@@ -1,37 +1,113 @@
 import os
+import asyncio
 from src.state import AppState
-from src.tools.gemini_client import text_to_speech
+from src.backends.registry import get_tts_backend
+from src.tools.tts_engine import language_code_for, synthesize_segments, synthesize_segments_async
+from src.tools.cache import get_cache, hash_text
 
 def synthesis_node(state: AppState) -> AppState:
     """
-    The node responsible for converting the translated text to speech.
+    The node responsible for converting the translated segments to speech.
+    Every segment gets its own audio file, and all of them are joined into one dubbed track.
     """
     print("--- NODE: Synthesizing Speech (TTS) ---")
+    job = _prepare(state)
+    if job is None:
+        return state
+
+    result = synthesize_segments(job["segments"], job["language_code"], job["speech_dir"], job["dubbed_audio_path"],
+                                 job["backend"])
+    return _apply(state, result, job)
+
+
+async def synthesis_node_async(state: AppState) -> AppState:
+    """
+    The async variant of synthesis_node, used by the async graph.
+    """
+    print("--- NODE: Synthesizing Speech (TTS) ---")
+    # A cache hit copies audio files; keep that off the event loop
+    job = await asyncio.to_thread(_prepare, state)
+    if job is None:
+        return state
+
+    result = await synthesize_segments_async(job["segments"], job["language_code"], job["speech_dir"],
+                                             job["dubbed_audio_path"], job["backend"])
+    # Storing the result in the cache copies the audio files
+    return await asyncio.to_thread(_apply, state, result, job)
 
+
+def _prepare(state: AppState) -> dict | None:
+    """
+    Checks the state, picks the TTS language and serves cache hits.
+
+    Returns:
+        dict: What the synthesis needs, or None when the node is already done
+              (skipped, failed or cached).
+    """
     if state.get("error"):
         print(f"Skipping TTS due to a previous error: {state['error']}")
-        return state
+        return None
 
-    translated_text = state.get("translated_text")
-    if not translated_text:
-        state["error"] = "Translated text not found in state."
-        return state
+    translated_segments = state.get("translated_segments")
+    if not translated_segments:
+        state["error"] = "Translated segments not found in state."
+        return None
 
-    output_dir = "output"
+    output_dir = state.get("temp_dir") or state.get("output_dir", "output")
+    speech_dir = os.path.join(output_dir, "speech")
+    os.makedirs(output_dir, exist_ok=True)
     dubbed_audio_path = os.path.join(output_dir, "dubbed_audio.mp3")
 
-    # We need to provide a more specific language code for the TTS API (e.g., 'tr-TR')
-    # We can create a simple mapping for this.
-    language_map = {"Turkish": "tr-TR", "English": "en-US", "Spanish": "es-ES"}
+    # The TTS API needs a more specific language code (e.g., 'tr-TR')
     target_language = state.get("target_language", "Turkish") # Default to Turkish
-    language_code = language_map.get(target_language, "tr-TR") 
+    language_code = language_code_for(target_language)
+    if not language_code:
+        state["error"] = (f"No TTS voice for the language '{target_language}'. Map it to a language code "
+                          f"through TTS_LANGUAGE_CODES (e.g. \"{target_language}=xx-XX\").")
+        return None
+
+    try:
+        backend = get_tts_backend()
+    except ValueError as e:
+        state["error"] = str(e)
+        return None
+
+    cache = get_cache()
+    cache_key = hash_text("speech", translated_segments, language_code, backend.voice_name(language_code),
+                           backend.audio_config())
+    cached = cache.fetch_files("speech", cache_key, speech_dir) if cache else None
+    if cached and "dubbed_audio.mp3" in cached:
+        print("Cache hit: re-using previously synthesized speech.")
+        os.replace(cached["dubbed_audio.mp3"], dubbed_audio_path)
+        state["dubbed_audio_path"] = dubbed_audio_path
+        state["dubbed_segments"] = [
+            {"id": seg["id"], "start": seg["start"], "end": seg["end"], "path": cached[f"seg_{seg['id']:04d}.mp3"]}
+            for seg in translated_segments if f"seg_{seg['id']:04d}.mp3" in cached
+        ]
+        return None
+
+    return {
+        "segments": translated_segments,
+        "language_code": language_code,
+        "speech_dir": speech_dir,
+        "dubbed_audio_path": dubbed_audio_path,
+        "backend": backend,
+        "cache": cache,
+        "cache_key": cache_key,
+    }
 
-    result = text_to_speech(translated_text, language_code, dubbed_audio_path)
 
+def _apply(state: AppState, result: dict, job: dict) -> AppState:
+    cache = job["cache"]
     if "error" in result:
         state["error"] = result["error"]
     else:
         state["dubbed_audio_path"] = result["dubbed_audio_path"]
+        state["dubbed_segments"] = result["dubbed_segments"]
+        if cache:
+            files = {os.path.basename(seg["path"]): seg["path"] for seg in result["dubbed_segments"]}
+            files["dubbed_audio.mp3"] = result["dubbed_audio_path"]
+            cache.put_files("speech", job["cache_key"], files)
         print("Speech synthesis successful.")
         
     return state
\ No newline at end of file
@@ -1,12 +1,16 @@
 # src/nodes/transcription.py
 
+import os
+import asyncio
 from src.state import AppState
-from src.tools.gemini_client import transcribe_audio_file
+from src.backends.registry import get_transcription_backend
+from src.tools.transcription_engine import transcribe_segments, transcribe_segments_async, segmentation_key
+from src.tools.cache import get_cache, hash_file, hash_text
 
 def transcription_node(state: AppState) -> AppState:
     """
-    The node responsible for transcribing the audio file.
-    It uses the gemini_client tool for the actual work.
+    The node responsible for transcribing the audio file into timed segments.
+    It uses the transcription_engine tool for the actual work.
     
     Args:
         state (AppState): The current state of the application.
@@ -15,27 +19,80 @@ def transcription_node(state: AppState) -> AppState:
         AppState: The updated state.
     """
     print("--- NODE: Transcribing Audio ---")
-    
+    job = _prepare(state)
+    if job is None:
+        return state
+
+    # Call the tool to do the heavy lifting
+    result = transcribe_segments(job["audio_path"], job["work_dir"], job["backend"])
+    return _apply(state, result, job)
+
+
+async def transcription_node_async(state: AppState) -> AppState:
+    """
+    The async variant of transcription_node, used by the async graph.
+    """
+    print("--- NODE: Transcribing Audio ---")
+    # Hashing the audio for the cache key reads the whole file; keep it off the event loop
+    job = await asyncio.to_thread(_prepare, state)
+    if job is None:
+        return state
+
+    result = await transcribe_segments_async(job["audio_path"], job["work_dir"], job["backend"])
+    # Storing the result in the cache writes to disk
+    return await asyncio.to_thread(_apply, state, result, job)
+
+
+def _prepare(state: AppState) -> dict | None:
+    """
+    Checks the state and serves cache hits.
+
+    Returns:
+        dict: What the transcription needs ('audio_path', 'work_dir', 'backend', 'cache', 'cache_key'),
+              or None when the node is already done (skipped, failed or cached).
+    """
     # Check for errors from the previous node
     if state.get("error"):
         print(f"Skipping transcription due to previous error: {state['error']}")
-        return state
+        return None
 
     audio_path = state.get("original_audio_path")
     if not audio_path:
         print("Error: Audio path is missing.")
         state["error"] = "Audio path not found in state."
-        return state
+        return None
+
+    try:
+        backend = get_transcription_backend()
+    except ValueError as e:
+        state["error"] = str(e)
+        return None
         
-    # Call the tool to do the heavy lifting
-    result = transcribe_audio_file(audio_path)
-    
+    # The same audio transcribed by the same model always gives a usable transcript
+    cache = get_cache()
+    cache_key = hash_text("segments", hash_file(audio_path), backend.model_name, segmentation_key()) if cache else None
+    cached = cache.get_json("transcription", cache_key) if cache else None
+    if cached:
+        print("Cache hit: re-using previous transcription.")
+        state["segments"] = cached["segments"]
+        state["transcription"] = cached["transcription"]
+        return None
+
+    work_dir = os.path.join(state.get("temp_dir") or state.get("output_dir", "output"), "chunks")
+    return {"audio_path": audio_path, "work_dir": work_dir, "backend": backend, "cache": cache, "cache_key": cache_key}
+
+
+def _apply(state: AppState, result: dict, job: dict) -> AppState:
     # Update the state with the results from the tool
+    cache = job["cache"]
     if "error" in result:
         print(f"Error during transcription: {result['error']}")
         state["error"] = result["error"]
     else:
+        state["segments"] = result["segments"]
         state["transcription"] = result["transcription"]
-        print("Transcription successful.")
+        if cache:
+            cache.put_json("transcription", job["cache_key"], result)
+        print(f"Transcription successful: {len(result['segments'])} segment(s).")
         
     return state
\ No newline at end of file
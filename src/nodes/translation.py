@@ -1,10 +1,13 @@
+import asyncio
 from src.state import AppState
-from src.tools.gemini_client import translate_text
+from src.backends.registry import get_translation_backend
+from src.tools.translation_engine import translate_segments_batched, translate_segments_batched_async
+from src.tools.cache import get_cache, hash_text
 
 def translation_node(state: AppState) -> AppState:
     """
-    The node responsible for translating the transcribed text.
-    It uses the gemini_client tool for the actual work.
+    The node responsible for translating the transcript segments.
+    It uses the translation_engine tool for the actual work and keeps each segment's timing.
     
     Args:
         state (AppState): The current application state.
@@ -13,28 +16,90 @@ def translation_node(state: AppState) -> AppState:
         AppState: The updated state with the translated text.
     """
     print("--- NODE: Translating Text ---")
-    
+    job = _prepare(state)
+    if job is None:
+        return state
+
+    # Call the translation tool
+    result = translate_segments_batched(job["segments"], job["target_language"], job["backend"])
+    return _apply(state, result, job)
+
+
+async def translation_node_async(state: AppState) -> AppState:
+    """
+    The async variant of translation_node, used by the async graph.
+    """
+    print("--- NODE: Translating Text ---")
+    # Cache lookups and stores read and write files; keep them off the event loop
+    job = await asyncio.to_thread(_prepare, state)
+    if job is None:
+        return state
+
+    result = await translate_segments_batched_async(job["segments"], job["target_language"], job["backend"])
+    return await asyncio.to_thread(_apply, state, result, job)
+
+
+def _prepare(state: AppState) -> dict | None:
+    """
+    Checks the state and serves cache hits.
+
+    Returns:
+        dict: What the translation needs ('segments', 'target_language', 'backend', 'cache', 'cache_key'),
+              or None when the node is already done (skipped, failed or cached).
+    """
     if state.get("error"):
         print(f"Skipping translation due to a previous error: {state['error']}")
-        return state
+        return None
 
-    transcription = state.get("transcription")
+    segments = state.get("segments")
     target_language = state.get("target_language")
 
-    if not transcription or not target_language:
-        print("Error: Transcription or target language is missing.")
-        state["error"] = "Transcription or target language not found in state."
-        return state
+    if not segments or not target_language:
+        print("Error: Transcript segments or target language is missing.")
+        state["error"] = "Transcript segments or target language not found in state."
+        return None
+
+    try:
+        backend = get_translation_backend()
+    except ValueError as e:
+        state["error"] = str(e)
+        return None
+
+    cache = get_cache()
+    cache_key = hash_text("translation", hash_text(segments), target_language, backend.model_name)
+    cached = cache.get_json("translation", cache_key) if cache else None
+    if cached:
+        print(f"Cache hit: re-using previous {target_language} translation.")
+        state["translated_segments"] = cached["translated_segments"]
+        state["translated_text"] = cached["translated_text"]
+        return None
+
+    return {
+        "segments": segments,
+        "target_language": target_language,
+        "backend": backend,
+        "cache": cache,
+        "cache_key": cache_key,
+    }
 
-    # Call the translation tool
-    result = translate_text(transcription, target_language)
 
+def _apply(state: AppState, result: dict, job: dict) -> AppState:
+    segments = job["segments"]
+    cache = job["cache"]
     if "error" in result:
         print(f"Error during translation: {result['error']}")
         state["error"] = result["error"]
     else:
-        # Update the state with the new translated text
-        state["translated_text"] = result["translated_text"]
+        # Update the state with the translated segments, keeping the original timing
+        translations = result["translations"]
+        translated_segments = [{**segment, "text": translations[segment["id"]]} for segment in segments]
+        state["translated_segments"] = translated_segments
+        state["translated_text"] = " ".join(segment["text"] for segment in translated_segments)
+        if cache:
+            cache.put_json("translation", job["cache_key"], {
+                "translated_segments": state["translated_segments"],
+                "translated_text": state["translated_text"],
+            })
         print("Translation successful.")
         
     return state
\ No newline at end of file
@@ -1,10 +1,11 @@
 import os
 from src.state import AppState
-from src.tools.media_tools import download_video_and_extract_audio
+from src.tools.media_tools import download_video_and_extract_audio, start_video_download
+from src.tools.cache import get_cache, video_cache_key
 
 def process_video_node(state: AppState) -> AppState:
     """
-    The node responsible for downloading the video and extracting audio.
+    The node responsible for downloading the audio and starting the video download.
     It uses the media_tools for the actual work.
     
     Args:
@@ -14,6 +15,10 @@ def process_video_node(state: AppState) -> AppState:
         AppState: The updated state.
     """
     print("--- NODE: Processing Video ---")
+
+    if state.get("error"):
+        print(f"Skipping video processing due to a previous error: {state['error']}")
+        return state
     
     youtube_url = state.get("youtube_url")
     if not youtube_url:
@@ -21,11 +26,36 @@ def process_video_node(state: AppState) -> AppState:
         state["error"] = "YouTube URL not found in state."
         return state
         
-    output_dir = "output"
+    # Downloads are intermediates and live in the job's temp directory
+    output_dir = state.get("temp_dir") or state.get("output_dir", "output")
     os.makedirs(output_dir, exist_ok=True)
     
+    # Re-use previous downloads of the same video if we have them
+    cache = get_cache()
+    cache_key = video_cache_key(youtube_url)
+    cached_audio = cache.fetch_files("audio", cache_key, output_dir) if cache else None
+    cached_video = cache.fetch_files("video", cache_key, output_dir) if cache else None
+    video_path = os.path.join(output_dir, "original_video.mp4")
+
+    if cached_video:
+        print("Cache hit: re-using previously downloaded video.")
+    else:
+        # The video downloads in the background; the final assembler waits for it
+        video_download = start_video_download(youtube_url, video_path)
+        if cache:
+            def store_video(future):
+                if future.exception() is None:
+                    cache.put_files("video", cache_key, {"original_video.mp4": video_path})
+            video_download.add_done_callback(store_video)
+
+    if cached_audio:
+        print("Cache hit: re-using previously extracted audio.")
+        state["original_video_path"] = video_path
+        state["original_audio_path"] = cached_audio["original_audio.mp3"]
+        return state
+
     # Call the tool to do the heavy lifting
-    result = download_video_and_extract_audio(youtube_url, output_dir)
+    result = download_video_and_extract_audio(youtube_url, output_dir, download_video_stream=False)
     
     # Update the state with the results from the tool
     if "error" in result:
@@ -34,6 +64,8 @@ def process_video_node(state: AppState) -> AppState:
     else:
         state["original_video_path"] = result["video_path"]
         state["original_audio_path"] = result["audio_path"]
-        print("Video processed successfully.")
+        if cache:
+            cache.put_files("audio", cache_key, {"original_audio.mp3": result["audio_path"]})
+        print("Audio extracted successfully; video is downloading in the background.")
         
     return state
\ No newline at end of file
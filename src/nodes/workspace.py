@@ -0,0 +1,61 @@
+from src.state import AppState
+from src.tools.video_encoding import get_encoding_profile
+from src.tools.workspace import create_workspace, cleanup_workspace, prune_workspaces
+
+def workspace_node(state: AppState) -> AppState:
+    """
+    The first node, responsible for giving the job its own output and temp directories.
+    A caller may pass 'job_id' (and even explicit directories) in the initial state.
+    The job's encoding profile is checked here too, so a bad profile fails the job
+    before anything is downloaded rather than in the last node.
+
+    Args:
+        state (AppState): The current state of the application.
+
+    Returns:
+        AppState: The updated state with 'job_id', 'output_dir' and 'temp_dir'.
+    """
+    print("--- NODE: Preparing Job Workspace ---")
+
+    try:
+        get_encoding_profile(state.get("encoding_profile"))
+    except ValueError as e:
+        state["error"] = str(e)
+        return state
+
+    if state.get("output_dir") and state.get("temp_dir"):
+        return state
+
+    workspace = create_workspace(state.get("job_id"))
+    state["job_id"] = workspace["job_id"]
+    state["output_dir"] = workspace["output_dir"]
+    state["temp_dir"] = workspace["temp_dir"]
+    print(f"Job {workspace['job_id']}: output in {workspace['output_dir']}")
+
+    return state
+
+
+def cleanup_node(state: AppState) -> AppState:
+    """
+    The last node, responsible for deleting the job's intermediate files and
+    applying the retention policy to old jobs.
+    Intermediates are kept when anything failed, so the job can be inspected or resumed.
+
+    Args:
+        state (AppState): The current state of the application.
+
+    Returns:
+        AppState: The unchanged state.
+    """
+    print("--- NODE: Cleaning Up Workspace ---")
+
+    failed = state.get("error") or any(dub.get("error") for dub in (state.get("dubs") or {}).values())
+    if failed:
+        print("Keeping intermediate files because the job did not complete successfully.")
+    elif state.get("temp_dir"):
+        results = [state.get("output_dir"), state.get("final_video_path")]
+        results += [dub.get("final_video_path") for dub in (state.get("dubs") or {}).values()]
+        cleanup_workspace(state["temp_dir"], keep=results)
+
+    prune_workspaces()
+    return state
@@ -1,4 +1,46 @@
-from typing import TypedDict
+from typing import Annotated, TypedDict
+
+
+def merge_dubs(left: dict | None, right: dict | None) -> dict:
+    """
+    Reducer for AppState['dubs'].
+    Parallel per-language branches each report {language: result}; merging by key
+    keeps every branch's result, and re-submitting the same language simply replaces it.
+    """
+    return {**(left or {}), **(right or {})}
+
+
+class Segment(TypedDict, total=False):
+    """
+    A timed piece of speech. Times are in seconds from the start of the original audio.
+    """
+    id: int
+    start: float
+    end: float
+    text: str
+    speaker: str | None
+
+
+class SpeechSegment(TypedDict):
+    """
+    The synthesized audio of one translated segment, with the timing of its source segment.
+    """
+    id: int
+    start: float
+    end: float
+    path: str
+
+
+class DubResult(TypedDict, total=False):
+    """
+    The outcome of dubbing the video into a single target language.
+    """
+    translated_text: str
+    dubbed_audio_path: str
+    aligned_audio_path: str
+    final_video_path: str
+    error: str | None
+
 
 class AppState(TypedDict):
     """
@@ -7,16 +49,36 @@ class AppState(TypedDict):
     """
     youtube_url: str
     target_language: str
+
+    # Multi-language mode: every language listed here gets its own dubbing branch
+    target_languages: list[str]
+
+    # The encoding profile for re-encoding the final video (see src.tools.video_encoding);
+    # None uses ENCODING_PROFILE
+    encoding_profile: str | None
+
+    # The job's isolated workspace: final results go to output_dir,
+    # intermediates to temp_dir (under ./output and ./temp by default)
+    job_id: str
+    output_dir: str
+    temp_dir: str
     
     # Paths will be populated by the nodes
     original_video_path: str
     original_audio_path: str
     
     # Data generated by AI
+    segments: list[Segment]
     transcription: str
+    translated_segments: list[Segment]
     translated_text: str
+    dubbed_segments: list[SpeechSegment]
     dubbed_audio_path: str
+    aligned_audio_path: str
     final_video_path: str
     
+    # Per-language results of a multi-language run, keyed by language
+    dubs: Annotated[dict[str, DubResult], merge_dubs]
+
     # To handle potential issues
     error: str | None
\ No newline at end of file
@@ -0,0 +1,164 @@
+import os
+import ffmpeg
+import numpy as np
+from src.tools.media_tools import get_media_duration
+from src.tools.concurrency import media_slot
+
+# Cloud TTS produces 24 kHz audio, so mixing at that rate avoids any resampling loss
+SAMPLE_RATE = 24000
+
+# Defaults, overridable through ALIGN_MAX_SPEEDUP / ALIGN_MAX_SLOWDOWN
+DEFAULT_MAX_SPEEDUP = 1.35
+DEFAULT_MAX_SLOWDOWN = 1.1
+
+# Overlap-add frame size (about 43 ms at 24 kHz); the hop is half a frame
+FRAME_SIZE = 1024
+
+# Length of the fade applied when a clip still has to be cut to fit its slot
+FADE_SECONDS = 0.05
+
+# The mixed track is encoded in blocks of this many seconds
+ENCODE_BLOCK_SECONDS = 30
+
+
+def decode_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes an audio file to mono float32 samples in [-1, 1] with ffmpeg.
+    """
+    raw, _ = (
+        ffmpeg.input(path)
+        .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=sample_rate)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def time_stretch(samples: np.ndarray, ratio: float) -> np.ndarray:
+    """
+    Changes the duration of a clip by 'ratio' without changing its pitch, using a
+    fully vectorized overlap-add: frames are read from the input every hop / ratio
+    samples and written to the output every hop samples under a Hann window.
+
+    Args:
+        samples (np.ndarray): Mono float32 samples.
+        ratio (float): Output length / input length (< 1 speeds speech up).
+
+    Returns:
+        np.ndarray: About len(samples) * ratio samples.
+    """
+    if abs(ratio - 1.0) < 0.01 or len(samples) < FRAME_SIZE:
+        return samples
+
+    hop = FRAME_SIZE // 2
+    target_length = int(round(len(samples) * ratio))
+    n_frames = int(np.ceil(target_length / hop)) + 1
+
+    # Read positions of every frame in the input, gathered with one fancy-index
+    starts = np.round(np.arange(n_frames) * (hop / ratio)).astype(np.int64)
+    padded = np.concatenate([samples, np.zeros(FRAME_SIZE, dtype=np.float32)])
+    starts = np.minimum(starts, len(samples))
+    frames = padded[starts[:, None] + np.arange(FRAME_SIZE)]
+
+    # A periodic Hann window at 50% overlap sums to exactly one
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(FRAME_SIZE) / FRAME_SIZE)
+    frames *= window.astype(np.float32)
+
+    # With a hop of half a frame, output block j is the first half of frame j
+    # plus the second half of frame j - 1
+    blocks = np.zeros((n_frames + 1, hop), dtype=np.float32)
+    blocks[:-1] += frames[:, :hop]
+    blocks[1:] += frames[:, hop:]
+    return blocks.ravel()[:target_length]
+
+
+def fit_to_slot(samples: np.ndarray, slot_samples: int, max_speedup: float, max_slowdown: float) -> np.ndarray:
+    """
+    Time-stretches a clip towards slot_samples within [1/max_speedup, max_slowdown],
+    then cuts it with a short fade if it is still too long. Shorter clips are left
+    as they are; the silence after them is the padding.
+    """
+    if slot_samples <= 0 or len(samples) == 0:
+        return samples[:0]
+
+    ratio = min(max(slot_samples / len(samples), 1.0 / max_speedup), max_slowdown)
+    fitted = time_stretch(samples, ratio)
+
+    if len(fitted) > slot_samples:
+        fitted = fitted[:slot_samples].copy()
+        fade = min(int(FADE_SECONDS * SAMPLE_RATE), slot_samples)
+        fitted[-fade:] *= np.linspace(1.0, 0.0, fade, dtype=np.float32)
+    return fitted
+
+
+def align_dubbed_segments(dubbed_segments: list, reference_audio_path: str, work_dir: str, output_path: str) -> dict:
+    """
+    A tool that builds a dub track in which every synthesized segment starts at the
+    timestamp of its source segment and is stretched to fit the time available.
+
+    The track is mixed into a float32 buffer preallocated as a memory-mapped file the
+    length of the original audio, so even hour-long videos need only one segment in RAM.
+    It is then encoded block by block to AAC through an ffmpeg pipe.
+
+    Args:
+        dubbed_segments (list): Segments with 'start', 'end' and 'path' of their audio.
+        reference_audio_path (str): The original audio, which sets the track length.
+        work_dir (str): A directory for the temporary mixing buffer.
+        output_path (str): Where to write the aligned track (.m4a).
+
+    Returns:
+        dict: {'aligned_audio_path': output_path}.
+              Returns {'error': message} on failure.
+    """
+    max_speedup = float(os.getenv("ALIGN_MAX_SPEEDUP", DEFAULT_MAX_SPEEDUP))
+    max_slowdown = float(os.getenv("ALIGN_MAX_SLOWDOWN", DEFAULT_MAX_SLOWDOWN))
+    buffer_path = os.path.join(work_dir, "aligned_mix.f32")
+
+    try:
+        os.makedirs(work_dir, exist_ok=True)
+        total_samples = int(np.ceil(get_media_duration(reference_audio_path) * SAMPLE_RATE))
+        print(f"Tool: Aligning {len(dubbed_segments)} segment(s) onto a {total_samples / SAMPLE_RATE:.1f}s track...")
+
+        # Mixing and encoding are CPU-bound; hold one media slot for both
+        with media_slot():
+            mix = np.memmap(buffer_path, dtype=np.float32, mode="w+", shape=(total_samples,))
+
+            ordered = sorted(dubbed_segments, key=lambda seg: seg["start"])
+            for index, segment in enumerate(ordered):
+                start = int(segment["start"] * SAMPLE_RATE)
+                if start >= total_samples:
+                    break
+                # A segment may use its own slot plus any pause before the next one starts
+                next_start = ordered[index + 1]["start"] if index + 1 < len(ordered) else total_samples / SAMPLE_RATE
+                slot_end = max(segment["end"], next_start)
+                slot_samples = min(int(slot_end * SAMPLE_RATE), total_samples) - start
+
+                clip = fit_to_slot(decode_audio(segment["path"]), slot_samples, max_speedup, max_slowdown)
+                mix[start:start + len(clip)] += clip
+
+            mix.flush()
+
+            # Stream the buffer to the encoder in fixed-size blocks
+            encoder = (
+                ffmpeg.input("pipe:", format="s16le", ac=1, ar=SAMPLE_RATE)
+                .output(output_path, acodec="aac", audio_bitrate="128k")
+                .global_args("-loglevel", "error", "-nostats")
+                .overwrite_output()
+                .run_async(pipe_stdin=True)
+            )
+            block = ENCODE_BLOCK_SECONDS * SAMPLE_RATE
+            for offset in range(0, total_samples, block):
+                pcm = np.clip(mix[offset:offset + block], -1.0, 1.0)
+                encoder.stdin.write((pcm * 32767).astype(np.int16).tobytes())
+            encoder.stdin.close()
+            if encoder.wait() != 0:
+                raise RuntimeError("ffmpeg failed to encode the aligned track.")
+
+        del mix
+        os.remove(buffer_path)
+        print(f"Tool: Aligned dub track saved to {output_path}")
+        return {"aligned_audio_path": output_path}
+
+    except Exception as e:
+        error_message = f"An error occurred during dub track alignment: {e}"
+        print(f"ERROR in audio_alignment: {error_message}")
+        return {"error": error_message}
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from urllib.parse import urlparse, parse_qs
+from src.tools.media_tools import local_source_path
+
+# Default settings, overridable through CACHE_DIRECTORY / CACHE_MAX_MB / CACHE_ENABLED
+DEFAULT_CACHE_DIRECTORY = "./cache"
+DEFAULT_CACHE_MAX_MB = 20480
+
+
+def hash_text(*parts) -> str:
+    """
+    Builds a stable SHA-256 key from any number of JSON-serializable parts.
+    """
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Computes the SHA-256 of a file without loading it into memory at once.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def video_cache_key(url: str) -> str:
+    """
+    Returns a cache key for a video URL.
+    YouTube links are reduced to their video ID so that 'youtu.be/ID',
+    'watch?v=ID&t=10' and 'shorts/ID' all map to the same entry.
+    Local files are identified by path, size and modification time.
+    """
+    local_path = local_source_path(url.strip())
+    if local_path:
+        stat = os.stat(local_path)
+        return hash_text("video", f"file:{os.path.abspath(local_path)}", stat.st_size, stat.st_mtime_ns)
+
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower().removeprefix("www.").removeprefix("m.")
+    video_id = None
+    if host == "youtu.be":
+        video_id = parsed.path.lstrip("/").split("/")[0]
+    elif host.endswith("youtube.com"):
+        if parsed.path.startswith(("/shorts/", "/embed/", "/live/")):
+            video_id = parsed.path.split("/")[2]
+        else:
+            video_id = parse_qs(parsed.query).get("v", [None])[0]
+
+    identity = f"youtube:{video_id}" if video_id else url.strip()
+    return hash_text("video", identity)
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+class ArtifactCache:
+    """
+    A persistent, content-addressed cache for the artifacts produced by the graph nodes.
+
+    Every entry is a directory at <root>/<namespace>/<key[:2]>/<key> holding one or
+    more files. The modification time of the entry directory is refreshed on every
+    hit and is used as the LRU clock when the cache grows beyond max_bytes.
+
+    The size of the cache is kept as a running total, counted once from disk and then
+    updated on every store and eviction; the tree is walked again only when the total
+    exceeds max_bytes (which also corrects it for entries stored by other processes).
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {}
+        # Bytes on disk, counted on first use (see _size)
+        self._total = None
+        os.makedirs(self.root, exist_ok=True)
+
+    # --- Lookup ---
+
+    def _entry_dir(self, namespace: str, key: str) -> str:
+        return os.path.join(self.root, namespace, key[:2], key)
+
+    def _record(self, namespace: str, outcome: str):
+        with self._lock:
+            counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "stores": 0, "evictions": 0})
+            counters[outcome] += 1
+
+    def _lookup(self, namespace: str, key: str) -> str | None:
+        entry_dir = self._entry_dir(namespace, key)
+        if not os.path.isdir(entry_dir):
+            self._record(namespace, "misses")
+            return None
+        try:
+            # Refresh the LRU clock of this entry
+            os.utime(entry_dir, None)
+        except FileNotFoundError:
+            # Evicted by another worker between the check and the touch
+            self._record(namespace, "misses")
+            return None
+        self._record(namespace, "hits")
+        return entry_dir
+
+    def fetch_files(self, namespace: str, key: str, dest_dir: str) -> dict | None:
+        """
+        Materializes a cached entry into dest_dir.
+        Files are copied rather than linked, so that a job overwriting its own outputs
+        can never corrupt the cache, and eviction never removes a file a job still uses.
+
+        Returns:
+            dict: {filename: path in dest_dir}, or None on a cache miss.
+        """
+        entry_dir = self._lookup(namespace, key)
+        if entry_dir is None:
+            return None
+
+        os.makedirs(dest_dir, exist_ok=True)
+        paths = {}
+        try:
+            for filename in os.listdir(entry_dir):
+                source = os.path.join(entry_dir, filename)
+                target = os.path.join(dest_dir, filename)
+                shutil.copy2(source, target)
+                paths[filename] = target
+        except FileNotFoundError:
+            return None
+        return paths
+
+    def get_json(self, namespace: str, key: str):
+        """
+        Returns the JSON value stored under (namespace, key), or None on a miss.
+        """
+        entry_dir = self._lookup(namespace, key)
+        if entry_dir is None:
+            return None
+        try:
+            with open(os.path.join(entry_dir, "value.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    # --- Storage ---
+
+    def _commit(self, namespace: str, key: str, staging_dir: str):
+        entry_dir = self._entry_dir(namespace, key)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        size = _dir_size(staging_dir)
+        try:
+            os.rename(staging_dir, entry_dir)
+        except OSError:
+            # Another worker stored the same artifact first; keep theirs
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            size = 0
+        self._record(namespace, "stores")
+        with self._lock:
+            self._total = self._size() + size
+        self.evict()
+
+    def _staging_dir(self) -> str:
+        staging_dir = os.path.join(self.root, ".staging", uuid.uuid4().hex)
+        os.makedirs(staging_dir)
+        return staging_dir
+
+    def put_files(self, namespace: str, key: str, files: dict):
+        """
+        Stores copies of the given files ({filename: source path}) under (namespace, key).
+        """
+        staging_dir = self._staging_dir()
+        try:
+            for filename, source in files.items():
+                shutil.copy2(source, os.path.join(staging_dir, filename))
+        except OSError as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            print(f"Cache: Could not store {namespace}/{key[:12]}: {e}")
+            return
+        self._commit(namespace, key, staging_dir)
+
+    def put_json(self, namespace: str, key: str, value):
+        """
+        Stores a JSON-serializable value under (namespace, key).
+        """
+        staging_dir = self._staging_dir()
+        with open(os.path.join(staging_dir, "value.json"), "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        self._commit(namespace, key, staging_dir)
+
+    # --- Eviction and statistics ---
+
+    def _entries(self) -> list:
+        entries = []
+        for namespace in os.listdir(self.root):
+            namespace_dir = os.path.join(self.root, namespace)
+            if namespace.startswith(".") or not os.path.isdir(namespace_dir):
+                continue
+            for prefix in os.listdir(namespace_dir):
+                prefix_dir = os.path.join(namespace_dir, prefix)
+                for key in os.listdir(prefix_dir):
+                    entry_dir = os.path.join(prefix_dir, key)
+                    try:
+                        entries.append((os.path.getmtime(entry_dir), _dir_size(entry_dir), namespace, entry_dir))
+                    except FileNotFoundError:
+                        continue
+        return entries
+
+    def _size(self) -> int:
+        # Callers hold self._lock
+        if self._total is None:
+            self._total = sum(size for _, size, _, _ in self._entries())
+        return self._total
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        """
+        with self._lock:
+            if self._size() <= self.max_bytes:
+                return
+            entries = self._entries()
+            self._total = sum(size for _, size, _, _ in entries)
+            for _, size, namespace, entry_dir in sorted(entries):
+                if self._total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "stores": 0, "evictions": 0})
+                counters["evictions"] += 1
+                self._total -= size
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss/store/eviction counters per namespace plus the current size on disk.
+        """
+        with self._lock:
+            counters = {namespace: dict(values) for namespace, values in self._stats.items()}
+            size = self._size()
+        return {"namespaces": counters, "size_bytes": size, "max_bytes": self.max_bytes}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ArtifactCache | None:
+    """
+    Returns the process-wide artifact cache, or None when CACHE_ENABLED is false.
+    """
+    global _cache
+    if os.getenv("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            root = os.getenv("CACHE_DIRECTORY", DEFAULT_CACHE_DIRECTORY)
+            max_mb = int(os.getenv("CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+            _cache = ArtifactCache(root, max_mb * 1024 * 1024)
+    return _cache
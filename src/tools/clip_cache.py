@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import threading
+import time
+from src.tools.cache import DEFAULT_CACHE_DIRECTORY
+from src.tools.sqlite_util import connection
+
+# Default, overridable through TTS_CLIP_CACHE_MB; the database lives in CACHE_DIRECTORY
+# unless TTS_CLIP_CACHE_PATH is set
+DEFAULT_CLIP_CACHE_MB = 2048
+
+
+class ClipCache:
+    """
+    Synthesized speech clips, one per sentence, stored as blobs in a single SQLite
+    database. Clips are a few kilobytes each, so one database holds them far more compactly
+    than one file (or cache entry directory) per clip, and lookups stay fast however many
+    there are. The least recently used clips are evicted above max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with connection(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS clips (
+                    key TEXT PRIMARY KEY,
+                    audio BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    used_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS clips_used_at ON clips (used_at)")
+
+    def present(self, keys: list) -> set:
+        """
+        Returns which of the given clip keys are cached.
+        """
+        found = set()
+        with connection(self.path) as conn:
+            # Stay below SQLite's limit on query parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = conn.execute(f"SELECT key FROM clips WHERE key IN ({', '.join('?' * len(batch))})", batch)
+                found.update(key for key, in rows)
+        return found
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Returns the audio of a clip, or None if it is not (or no longer) cached.
+        """
+        with connection(self.path) as conn:
+            row = conn.execute("SELECT audio FROM clips WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE clips SET used_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key: str, audio: bytes):
+        """
+        Stores the audio of a clip and evicts the least recently used clips if needed.
+        """
+        with connection(self.path) as conn:
+            conn.execute("INSERT OR REPLACE INTO clips (key, audio, size, used_at) VALUES (?, ?, ?, ?)",
+                         (key, sqlite3.Binary(audio), len(audio), time.time()))
+            total, = conn.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()
+            if total > self.max_bytes:
+                self._evict(conn, total)
+
+    def _evict(self, conn: sqlite3.Connection, total: int):
+        # Remove down to 90% of the limit, so that eviction does not run on every put
+        target = self.max_bytes * 0.9
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM clips ORDER BY used_at"):
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM clips WHERE key = ?", victims)
+
+    def stats(self) -> dict:
+        with connection(self.path) as conn:
+            clips, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clips").fetchone()
+        return {"clips": clips, "size_bytes": size, "max_bytes": self.max_bytes}
+
+
+_clip_cache = None
+_clip_cache_lock = threading.Lock()
+
+
+def get_clip_cache() -> ClipCache | None:
+    """
+    Returns the process-wide speech clip cache, or None when CACHE_ENABLED is false.
+    """
+    global _clip_cache
+    if os.getenv("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _clip_cache_lock:
+        if _clip_cache is None:
+            default_path = os.path.join(os.getenv("CACHE_DIRECTORY", DEFAULT_CACHE_DIRECTORY), "clips.db")
+            path = os.getenv("TTS_CLIP_CACHE_PATH", default_path)
+            max_mb = int(os.getenv("TTS_CLIP_CACHE_MB", DEFAULT_CLIP_CACHE_MB))
+            _clip_cache = ClipCache(path, max_mb * 1024 * 1024)
+    return _clip_cache
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+
+# Defaults, overridable through MEDIA_CONCURRENCY / API_CONCURRENCY
+DEFAULT_API_CONCURRENCY = 16
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+# asyncio semaphores belong to one event loop, so the async limits are kept per loop
+_async_semaphores = weakref.WeakKeyDictionary()
+
+
+def _semaphore(name: str, default: int) -> threading.BoundedSemaphore:
+    with _semaphores_lock:
+        if name not in _semaphores:
+            _semaphores[name] = threading.BoundedSemaphore(max(1, int(os.getenv(name, default))))
+    return _semaphores[name]
+
+
+@contextmanager
+def media_slot():
+    """
+    Limits how many CPU-bound media operations (ffmpeg transcodes, splitting, mixing,
+    encoding) run at once in this process, across all jobs. Defaults to one per CPU core.
+    """
+    semaphore = _semaphore("MEDIA_CONCURRENCY", os.cpu_count() or 1)
+    with semaphore:
+        yield
+
+
+@contextmanager
+def api_slot():
+    """
+    Limits how many I/O-bound Gemini and Text-to-Speech requests are in flight at once
+    in this process, across all jobs.
+    """
+    semaphore = _semaphore("API_CONCURRENCY", DEFAULT_API_CONCURRENCY)
+    with semaphore:
+        yield
+
+
+def _async_semaphore(name: str, default: int) -> asyncio.Semaphore:
+    per_loop = _async_semaphores.setdefault(asyncio.get_running_loop(), {})
+    if name not in per_loop:
+        per_loop[name] = asyncio.Semaphore(max(1, int(os.getenv(name, default))))
+    return per_loop[name]
+
+
+@asynccontextmanager
+async def api_slot_async():
+    """
+    The async counterpart of api_slot: limits how many requests the coroutines of one
+    event loop have in flight at once, without blocking the loop while waiting.
+    """
+    async with _async_semaphore("API_CONCURRENCY", DEFAULT_API_CONCURRENCY):
+        yield
@@ -1,87 +1,354 @@
 import os
+import json
+import asyncio
+import threading
 import time
-import google.generativeai as genai
-from google.cloud import texttospeech
+import weakref
+from typing import TYPE_CHECKING
+import aiofiles
 from dotenv import load_dotenv
+from src.tools.rate_limiter import get_rate_limiter
+from src.tools.concurrency import api_slot, api_slot_async
+from src.instrumentation import record_api_call
+
+if TYPE_CHECKING:
+    from google.cloud import texttospeech
+
+# The model used for both transcription and translation.
+# It is also part of the cache keys, so changing it invalidates cached results.
+GEMINI_MODEL_NAME = "models/gemini-1.5-pro-latest"
+
+# Polling of uploaded files in the async tools: the first check comes quickly and the
+# interval then doubles up to the maximum
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 8.0
+
+CHUNK_TRANSCRIPTION_PROMPT = (
+    "Transcribe this English audio clip. Return a JSON array with one object per utterance, "
+    "each with the keys \"start\" and \"end\" (seconds from the beginning of this clip, as numbers), "
+    "\"text\" (the exact spoken words) and \"speaker\" (a label such as \"Speaker 1\", or null if unknown). "
+    "Output only the JSON array."
+)
+
+JSON_RESPONSE = {"response_mime_type": "application/json"}
+
+
+# Default, overridable through TTS_VOICE (a name template) or, for a single language,
+# TTS_VOICE_<LANGUAGE CODE> (e.g. TTS_VOICE_TR_TR=tr-TR-Wavenet-B)
+DEFAULT_TTS_VOICE = "{language_code}-Wavenet-A"
+
+
+def tts_voice_name(language_code: str) -> str:
+    """
+    Returns the TTS voice used for a language code, e.g. 'tr-TR-Wavenet-A'.
+    """
+    voice = os.getenv(f"TTS_VOICE_{language_code.replace('-', '_').upper()}")
+    return voice or os.getenv("TTS_VOICE", DEFAULT_TTS_VOICE).format(language_code=language_code)
+
+
+# The SDKs are imported and the clients built on first use, so importing this module
+# is cheap and needs no credentials
+_genai = None
+_model = None
+_tts_client = None
+_clients_lock = threading.Lock()
+
+
+def get_genai():
+    """
+    Returns the google.generativeai module, imported and configured on first use.
+    The API key is read from GOOGLE_API_KEY (or the .env file).
+
+    Raises:
+        ValueError: If no API key is set. The tools report this as an error result.
+    """
+    global _genai
+    with _clients_lock:
+        if _genai is None:
+            load_dotenv()
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if not api_key:
+                raise ValueError("GOOGLE_API_KEY not found in .env file.")
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            _genai = genai
+    return _genai
+
+
+def get_model():
+    """
+    Returns the process-wide GenerativeModel for GEMINI_MODEL_NAME, shared by every
+    threaded transcription and translation request (see get_async_model for the async tools).
+    """
+    global _model
+    genai = get_genai()
+    with _clients_lock:
+        if _model is None:
+            _model = genai.GenerativeModel(model_name=GEMINI_MODEL_NAME)
+    return _model
+
+
+def get_tts_client() -> "texttospeech.TextToSpeechClient":
+    """
+    Returns the process-wide Text-to-Speech client.
+    The client keeps a pooled gRPC channel and is safe to share between threads,
+    so concurrent synthesis requests all reuse one connection.
+    """
+    global _tts_client
+    with _clients_lock:
+        if _tts_client is None:
+            from google.cloud import texttospeech
+            _tts_client = texttospeech.TextToSpeechClient()
+    return _tts_client
+
+
+# gRPC asyncio channels are bound to the event loop that created them
+_async_models = weakref.WeakKeyDictionary()
+_async_tts_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_model():
+    """
+    Returns the GenerativeModel of the running event loop, for the async tools.
+    A model builds its async client on first use, bound to that loop, so it cannot be
+    shared with the threaded tools or another loop.
+    """
+    genai = get_genai()
+    loop = asyncio.get_running_loop()
+    if loop not in _async_models:
+        _async_models[loop] = genai.GenerativeModel(model_name=GEMINI_MODEL_NAME)
+    return _async_models[loop]
+
+
+def get_async_tts_client() -> "texttospeech.TextToSpeechAsyncClient":
+    """
+    Returns the Text-to-Speech async client of the running event loop,
+    shared by every coroutine on that loop.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _async_tts_clients:
+        from google.cloud import texttospeech
+        _async_tts_clients[loop] = texttospeech.TextToSpeechAsyncClient()
+    return _async_tts_clients[loop]
+
+
+def _upload_and_wait(audio_path: str):
+    """
+    Uploads an audio file to Gemini and blocks until the service has processed it.
+    """
+    print(f"Tool: Uploading audio file to Gemini: {audio_path}")
+    with api_slot():
+        audio_file = get_genai().upload_file(path=audio_path)
+    record_api_call("gemini", "upload")
+
+    while audio_file.state.name == "PROCESSING":
+        print("Tool: Waiting for Gemini audio processing...", end="\r")
+        time.sleep(2)
+        audio_file = get_genai().get_file(audio_file.name)
+
+    if audio_file.state.name == "FAILED":
+        raise ValueError("Gemini file processing failed.")
+    return audio_file
+
+
+async def _upload_and_wait_async(audio_path: str):
+    """
+    Uploads an audio file to Gemini and waits, polling with backoff, until the service
+    has processed it. The SDK has no async file API, so its calls run in a worker thread.
+    """
+    print(f"Tool: Uploading audio file to Gemini: {audio_path}")
+    async with api_slot_async():
+        audio_file = await asyncio.to_thread(get_genai().upload_file, path=audio_path)
+    record_api_call("gemini", "upload")
+
+    delay = POLL_INITIAL_DELAY
+    while audio_file.state.name == "PROCESSING":
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_DELAY)
+        audio_file = await asyncio.to_thread(get_genai().get_file, audio_file.name)
+
+    if audio_file.state.name == "FAILED":
+        raise ValueError("Gemini file processing failed.")
+    return audio_file
+
+
+async def _delete_file_async(name: str):
+    await asyncio.to_thread(get_genai().delete_file, name)
+
+
+def _parse_json_response(text: str):
+    """
+    Parses a JSON model response, tolerating a surrounding ```json fence.
+    """
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else ""
+        cleaned = cleaned.rsplit("```", 1)[0]
+    return json.loads(cleaned)
+
+
+def _chunk_segments(response_text: str, duration: float) -> list:
+    """
+    Turns the model's answer for one chunk into clean segments, clamped to the chunk length.
+    """
+    try:
+        raw_segments = _parse_json_response(response_text)
+        if isinstance(raw_segments, dict):
+            raw_segments = raw_segments.get("segments", [])
+    except ValueError:
+        # The model ignored the format; keep the text as one segment covering the chunk
+        raw_segments = [{"start": 0.0, "end": duration, "text": response_text, "speaker": None}]
+
+    segments = []
+    for raw in raw_segments:
+        text = str(raw.get("text", "")).strip()
+        if not text:
+            continue
+        start = min(max(float(raw.get("start") or 0.0), 0.0), duration)
+        end = min(max(float(raw.get("end") or duration), start), duration)
+        segments.append({"start": start, "end": end, "text": text, "speaker": raw.get("speaker")})
+    return segments
+
+
+def _segments_translation_prompt(segments: list, target_language: str) -> str:
+    payload = json.dumps([{"id": seg["id"], "text": seg["text"]} for seg in segments], ensure_ascii=False)
+    return (f"Translate the \"text\" of every object in the following JSON array from English into {target_language}. "
+            f"Keep each \"id\" unchanged and return a JSON array of objects with the keys \"id\" and \"text\", "
+            f"one per input object, without any additional comments or explanations.\n\n{payload}")
+
+
+def _parse_translations(response_text: str, segments: list) -> dict:
+    """
+    Maps segment IDs to their translations and checks that none is missing.
+    """
+    translations = {int(item["id"]): str(item["text"]) for item in _parse_json_response(response_text)}
+    missing = [seg["id"] for seg in segments if seg["id"] not in translations]
+    if missing:
+        raise ValueError(f"Translation is missing segment(s) {missing}")
+    return translations
+
+
+def _speech_request(text_to_synthesize: str, language_code: str) -> dict:
+    """
+    Builds the Text-to-Speech request: the text, the configured voice and MP3 output.
+    The default WaveNet voices are among Google's most natural-sounding voices.
+    """
+    from google.cloud import texttospeech
+    return {
+        "input": texttospeech.SynthesisInput(text=text_to_synthesize),
+        "voice": texttospeech.VoiceSelectionParams(
+            language_code=language_code,
+            name=tts_voice_name(language_code),  # Example: 'tr-TR-Wavenet-A'
+        ),
+        "audio_config": texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3),
+    }
+
+
+def upload_audio(audio_path: str) -> dict:
+    """
+    A tool that uploads an audio file to Gemini and waits until it can be used in prompts.
 
-# Load and configure the API at the module level
-load_dotenv()
-try:
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not found in .env file.")
-    genai.configure(api_key=api_key)
-except ValueError as e:
-    print(e)
-    # This will prevent the application from starting without an API key
-    exit()
-
-def transcribe_audio_file(audio_path: str) -> dict:
-    """
-    A tool that transcribes an audio file using the Gemini 1.5 Pro model.
-    
     Args:
         audio_path (str): The path to the audio file.
 
     Returns:
-        dict: A dictionary with the transcription text.
+        dict: {'file': the uploaded file}.
               Returns {'error': message} on failure.
     """
     try:
-        print(f"Tool: Uploading audio file to Gemini: {audio_path}")
-        audio_file = genai.upload_file(path=audio_path)
-        
-        while audio_file.state.name == "PROCESSING":
-            print("Tool: Waiting for Gemini audio processing...", end="\r")
-            time.sleep(2)
-            audio_file = genai.get_file(audio_file.name)
+        return {"file": _upload_and_wait(audio_path)}
 
-        if audio_file.state.name == "FAILED":
-            raise ValueError("Gemini file processing failed.")
-        
-        print("Tool: Audio processed. Sending transcription request.     ")
-        model = genai.GenerativeModel(model_name="models/gemini-1.5-pro-latest")
-        prompt = "Provide a full and accurate transcription of this English audio file. Only output the transcribed text."
-        response = model.generate_content([prompt, audio_file])
-        
-        # Clean up the uploaded file from Gemini's storage
-        genai.delete_file(audio_file.name)
-        print("Tool: Transcription complete and cloud file deleted.")
+    except Exception as e:
+        error_message = f"An error occurred while uploading the audio: {e}"
+        print(f"ERROR in gemini_client: {error_message}")
+        return {"error": error_message}
+
+
+def transcribe_uploaded_chunk(audio_file, duration: float) -> dict:
+    """
+    A tool that transcribes an uploaded audio chunk (see upload_audio) into timed segments.
+
+    Args:
+        audio_file: The uploaded file.
+        duration (float): The length of the chunk in seconds, used to clamp timestamps.
+
+    Returns:
+        dict: {'segments': [{'start', 'end', 'text', 'speaker'}, ...]} with times
+              relative to the start of the chunk.
+              Returns {'error': message} on failure.
+    """
+    try:
+        model = get_model()
+        get_rate_limiter().acquire()
+        with api_slot():
+            response = model.generate_content([CHUNK_TRANSCRIPTION_PROMPT, audio_file],
+                                              generation_config=JSON_RESPONSE)
+        record_api_call("gemini", "transcribe", response)
+        return {"segments": _chunk_segments(response.text, duration)}
 
-        return {"transcription": response.text}
-    
     except Exception as e:
-        print(f"ERROR in gemini_client: {e}")
-        return {"error": str(e)}
-    
+        error_message = f"An error occurred during chunk transcription: {e}"
+        print(f"ERROR in gemini_client: {error_message}")
+        return {"error": error_message}
 
-def translate_text(text_to_translate: str, target_language: str) -> dict:
+
+def delete_uploaded_file(audio_file):
+    """
+    Deletes an uploaded file from Gemini's storage. Failures are only reported,
+    since the service also expires uploaded files on its own.
+    """
+    try:
+        get_genai().delete_file(audio_file.name)
+    except Exception as e:
+        print(f"WARNING in gemini_client: Could not delete uploaded file {audio_file.name}: {e}")
+
+
+def transcribe_audio_chunk(audio_path: str, duration: float) -> dict:
+    """
+    A tool that transcribes one audio chunk into timed segments using Gemini:
+    the chunk is uploaded, transcribed and deleted from Gemini's storage again.
+
+    Args:
+        audio_path (str): The path to the audio chunk.
+        duration (float): The length of the chunk in seconds, used to clamp timestamps.
+
+    Returns:
+        dict: {'segments': [{'start', 'end', 'text', 'speaker'}, ...]} with times
+              relative to the start of the chunk.
+              Returns {'error': message} on failure.
     """
-    A tool that translates a given text to a target language using Gemini.
+    uploaded = upload_audio(audio_path)
+    if "error" in uploaded:
+        return uploaded
+    try:
+        return transcribe_uploaded_chunk(uploaded["file"], duration)
+    finally:
+        delete_uploaded_file(uploaded["file"])
     
+
+def translate_segments(segments: list, target_language: str) -> dict:
+    """
+    A tool that translates a list of transcript segments to a target language using Gemini.
+    Segment IDs are sent along with the text so the answer can be matched back reliably.
+
     Args:
-        text_to_translate (str): The text to be translated.
+        segments (list): Segments with at least 'id' and 'text'.
         target_language (str): The language to translate the text into.
 
     Returns:
-        dict: A dictionary with the translated text.
+        dict: {'translations': {segment id: translated text}}.
               Returns {'error': message} on failure.
     """
     try:
-        print(f"Tool: Translating text to {target_language}...")
-        
-        # We use a standard generative model for this text-to-text task
-        model = genai.GenerativeModel(model_name="models/gemini-1.5-pro-latest")
-        
-        # A clear and direct prompt for translation
-        prompt = (f"Translate the following English text into {target_language}. "
-                  f"Provide only the translated text, without any additional comments or explanations.\n\n"
-                  f"Text to translate:\n---\n{text_to_translate}")
-        
-        response = model.generate_content(prompt)
-        
-        print("Tool: Translation complete.")
-        return {"translated_text": response.text}
+        print(f"Tool: Translating {len(segments)} segment(s) to {target_language}...")
+        model = get_model()
+        prompt = _segments_translation_prompt(segments, target_language)
+
+        get_rate_limiter().acquire()
+        with api_slot():
+            response = model.generate_content(prompt, generation_config=JSON_RESPONSE)
+        record_api_call("gemini", "translate", response)
+        return {"translations": _parse_translations(response.text, segments)}
 
     except Exception as e:
         error_message = f"An error occurred during translation: {e}"
@@ -105,28 +372,13 @@ def text_to_speech(text_to_synthesize: str, language_code: str, output_path: str
     try:
         print(f"Tool: Synthesizing speech for language '{language_code}'...")
         
-        # Instantiate a client
-        client = texttospeech.TextToSpeechClient()
-        
-        # Set the text input to be synthesized
-        synthesis_input = texttospeech.SynthesisInput(text=text_to_synthesize)
-        
-        # Build the voice request, select the language and a high-quality voice
-        # WaveNet voices are Google's most natural-sounding voices.
-        voice = texttospeech.VoiceSelectionParams(
-            language_code=language_code, 
-            name=f"{language_code}-Wavenet-A" # Example: 'tr-TR-Wavenet-A' (Male voice)
-        )
-        
-        # Select the type of audio file you want
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3
-        )
+        # Re-use the shared client
+        client = get_tts_client()
         
         # Perform the text-to-speech request
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
+        with api_slot():
+            response = client.synthesize_speech(**_speech_request(text_to_synthesize, language_code))
+        record_api_call("tts", "synthesize", characters=len(text_to_synthesize))
         
         # The response's audio_content is binary.
         with open(output_path, "wb") as out:
@@ -138,4 +390,124 @@ def text_to_speech(text_to_synthesize: str, language_code: str, output_path: str
     except Exception as e:
         error_message = f"An error occurred during Text-to-Speech synthesis: {e}"
         print(f"ERROR in gemini_client: {error_message}")
-        return {"error": error_message}
\ No newline at end of file
+        return {"error": error_message}
+
+
+# --- Async variants ---
+# The same tools as coroutines, for the async graph (see create_graph(use_async=True)).
+# They share the rate limiter with the threaded tools and never block the event loop.
+
+async def upload_audio_async(audio_path: str) -> dict:
+    """
+    The async counterpart of upload_audio.
+
+    Returns:
+        dict: {'file': the uploaded file}.
+              Returns {'error': message} on failure.
+    """
+    try:
+        return {"file": await _upload_and_wait_async(audio_path)}
+
+    except Exception as e:
+        error_message = f"An error occurred while uploading the audio: {e}"
+        print(f"ERROR in gemini_client: {error_message}")
+        return {"error": error_message}
+
+
+async def transcribe_uploaded_chunk_async(audio_file, duration: float) -> dict:
+    """
+    The async counterpart of transcribe_uploaded_chunk.
+
+    Returns:
+        dict: {'segments': [{'start', 'end', 'text', 'speaker'}, ...]} relative to the chunk.
+              Returns {'error': message} on failure.
+    """
+    try:
+        model = get_async_model()
+        await get_rate_limiter().acquire_async()
+        async with api_slot_async():
+            response = await model.generate_content_async([CHUNK_TRANSCRIPTION_PROMPT, audio_file],
+                                                          generation_config=JSON_RESPONSE)
+        record_api_call("gemini", "transcribe", response)
+        return {"segments": _chunk_segments(response.text, duration)}
+
+    except Exception as e:
+        error_message = f"An error occurred during chunk transcription: {e}"
+        print(f"ERROR in gemini_client: {error_message}")
+        return {"error": error_message}
+
+
+async def delete_uploaded_file_async(audio_file):
+    """
+    The async counterpart of delete_uploaded_file.
+    """
+    try:
+        await _delete_file_async(audio_file.name)
+    except Exception as e:
+        print(f"WARNING in gemini_client: Could not delete uploaded file {audio_file.name}: {e}")
+
+
+async def transcribe_audio_chunk_async(audio_path: str, duration: float) -> dict:
+    """
+    The async counterpart of transcribe_audio_chunk.
+
+    Returns:
+        dict: {'segments': [{'start', 'end', 'text', 'speaker'}, ...]} relative to the chunk.
+              Returns {'error': message} on failure.
+    """
+    uploaded = await upload_audio_async(audio_path)
+    if "error" in uploaded:
+        return uploaded
+    try:
+        return await transcribe_uploaded_chunk_async(uploaded["file"], duration)
+    finally:
+        await delete_uploaded_file_async(uploaded["file"])
+
+
+async def translate_segments_async(segments: list, target_language: str) -> dict:
+    """
+    The async counterpart of translate_segments.
+
+    Returns:
+        dict: {'translations': {segment id: translated text}}.
+              Returns {'error': message} on failure.
+    """
+    try:
+        print(f"Tool: Translating {len(segments)} segment(s) to {target_language}...")
+        model = get_async_model()
+        await get_rate_limiter().acquire_async()
+        async with api_slot_async():
+            response = await model.generate_content_async(_segments_translation_prompt(segments, target_language),
+                                                          generation_config=JSON_RESPONSE)
+        record_api_call("gemini", "translate", response)
+        return {"translations": _parse_translations(response.text, segments)}
+
+    except Exception as e:
+        error_message = f"An error occurred during translation: {e}"
+        print(f"ERROR in gemini_client: {error_message}")
+        return {"error": error_message}
+
+
+async def text_to_speech_async(text_to_synthesize: str, language_code: str, output_path: str) -> dict:
+    """
+    The async counterpart of text_to_speech, using the Text-to-Speech async client
+    and writing the MP3 file with aiofiles.
+
+    Returns:
+        dict: A dictionary with the path to the audio file.
+              Returns {'error': message} on failure.
+    """
+    try:
+        client = get_async_tts_client()
+        async with api_slot_async():
+            response = await client.synthesize_speech(**_speech_request(text_to_synthesize, language_code))
+        record_api_call("tts", "synthesize", characters=len(text_to_synthesize))
+
+        async with aiofiles.open(output_path, "wb") as out:
+            await out.write(response.audio_content)
+        return {"dubbed_audio_path": output_path}
+
+    except Exception as e:
+        error_message = f"An error occurred during Text-to-Speech synthesis: {e}"
+        print(f"ERROR in gemini_client: {error_message}")
+        return {"error": error_message}
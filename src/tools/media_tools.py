@@ -1,73 +1,225 @@
 import os
-import yt_dlp
-from moviepy.editor import VideoFileClip
-from moviepy.editor import VideoFileClip, AudioFileClip
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import unquote, urlparse
+import ffmpeg
+from src.tools.concurrency import media_slot
+from src.tools.video_encoding import aac_audio_options, encode_video_and_audio, exceeds_profile, get_encoding_profile
 
+# yt-dlp is slow to import, so it is imported by the functions that use it
 
-def download_video_and_extract_audio(url: str, output_dir: str) -> dict:
+# Video downloads run in the background while the audio is already being transcribed.
+# Pending downloads are tracked by their target path, so any later node can wait for them.
+_download_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="video-download")
+_pending_downloads = {}
+_pending_lock = threading.Lock()
+
+
+def local_source_path(url: str) -> str | None:
+    """
+    Returns the path of a local media file given as a plain path or a file:// URL,
+    or None for anything else. Local sources are processed without yt-dlp, which
+    lets the pipeline (and the benchmarks) run on files already on disk.
+    """
+    path = unquote(urlparse(url).path) if url.startswith("file://") else url
+    return path if os.path.isfile(path) else None
+
+
+def extract_audio(source_path: str, audio_path: str) -> str:
+    """
+    Transcodes the audio of a media file straight to a 16 kHz mono MP3 with ffmpeg.
+    Only the audio stream is read, and the result is a small, speech-friendly upload.
+    """
+    with media_slot():
+        (
+            ffmpeg.input(source_path)
+            .output(audio_path, vn=None, ac=1, ar=16000, audio_bitrate="48k")
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    return audio_path
+
+
+def download_audio(url: str, output_dir: str) -> str:
+    """
+    Downloads only the audio stream of a YouTube video and converts it for transcription.
+
+    Returns:
+        str: The path to 'original_audio.mp3' (16 kHz mono).
+    """
+    audio_path = os.path.join(output_dir, "original_audio.mp3")
+    local_path = local_source_path(url)
+    if local_path:
+        print(f"Tool: Extracting audio from local file {local_path}")
+        return extract_audio(local_path, audio_path)
+
+    print(f"Tool: Downloading audio stream using yt-dlp from {url}")
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'outtmpl': os.path.join(output_dir, 'source_audio.%(ext)s'),
+        'quiet': True, # Suppress console output from yt-dlp
+        'overwrites': True, # Overwrite file if it exists
+    }
+    import yt_dlp
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=True)
+        source_path = ydl.prepare_filename(info)
+
+    if not os.path.exists(source_path):
+        raise FileNotFoundError("yt-dlp failed to download the audio stream.")
+
+    extract_audio(source_path, audio_path)
+    os.remove(source_path)
+    print(f"Tool: Audio saved to {audio_path}")
+    return audio_path
+
+
+def download_video(url: str, video_path: str) -> str:
+    """
+    Downloads the video stream of a YouTube video. The original audio is not needed,
+    since the final video gets the dubbed track, so no merge step is required.
+    """
+    local_path = local_source_path(url)
+    if local_path:
+        # The video stream of a local file is copied without its audio, like the download
+        print(f"Tool: Copying video stream from local file {local_path}")
+        ffmpeg.input(local_path)["v:0"].output(video_path, vcodec="copy").overwrite_output().run(
+            capture_stdout=True, capture_stderr=True
+        )
+        return video_path
+
+    print(f"Tool: Downloading video stream using yt-dlp from {url}")
+    ydl_opts = {
+        'format': 'bestvideo[ext=mp4]/best[ext=mp4]/best',
+        'outtmpl': video_path,
+        'quiet': True, # Suppress console output from yt-dlp
+        'overwrites': True, # Overwrite file if it exists
+    }
+    import yt_dlp
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        ydl.download([url])
+
+    if not os.path.exists(video_path):
+        raise FileNotFoundError("yt-dlp failed to download the video file.")
+    print(f"Tool: Video saved to {video_path}")
+    return video_path
+
+
+def start_video_download(url: str, video_path: str) -> Future:
+    """
+    Starts downloading the video stream in the background and returns its future.
+    Starting the same path twice returns the download already in progress.
+    """
+    with _pending_lock:
+        future = _pending_downloads.get(video_path)
+        if future is None:
+            future = _download_executor.submit(download_video, url, video_path)
+            _pending_downloads[video_path] = future
+    return future
+
+
+def wait_for_video(video_path: str, url: str | None = None) -> dict:
+    """
+    A tool that blocks until the video at video_path is available.
+    If no download is pending and the file is missing (e.g. after a restart),
+    it is downloaded again from url.
+
+    Returns:
+        dict: {'video_path': video_path}.
+              Returns {'error': message} on failure.
+    """
+    with _pending_lock:
+        future = _pending_downloads.get(video_path)
+    try:
+        if future is not None:
+            print("Tool: Waiting for the background video download to finish...")
+            future.result()
+            with _pending_lock:
+                _pending_downloads.pop(video_path, None)
+        elif not os.path.exists(video_path):
+            if not url:
+                raise FileNotFoundError(f"Video file {video_path} does not exist.")
+            download_video(url, video_path)
+        return {"video_path": video_path}
+
+    except Exception as e:
+        with _pending_lock:
+            _pending_downloads.pop(video_path, None)
+        error_message = f"An error occurred while downloading the video: {e}"
+        print(f"ERROR in media_tools: {error_message}")
+        return {"error": error_message}
+
+
+def download_video_and_extract_audio(url: str, output_dir: str, download_video_stream: bool = True) -> dict:
     """
-    A tool that downloads a YouTube video using yt-dlp and extracts its audio.
+    A tool that downloads the audio of a YouTube video and starts its video download.
+
+    The audio stream is fetched on its own and converted directly to a 16 kHz mono MP3,
+    so transcription can start right away. The video stream keeps downloading in the
+    background; use wait_for_video() before reading 'video_path'.
     
     Args:
         url (str): The YouTube video URL.
         output_dir (str): The directory to save files in.
+        download_video_stream (bool): Set to False when the video is already available.
 
     Returns:
-        dict: A dictionary containing paths to the video and audio files.
+        dict: A dictionary containing paths to the video and audio files, plus the
+              'video_download' future when a background download was started.
               Returns {'error': message} on failure.
     """
     try:
-        video_filename = "original_video.mp4"
-        video_path = os.path.join(output_dir, video_filename)
-        
-        # --- Video Download with yt-dlp ---
-        print(f"Tool: Downloading video using yt-dlp from {url}")
-        
-        # Options for yt-dlp
-        # We want the best video format that includes audio, in mp4 format.
-        ydl_opts = {
-            'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-            'outtmpl': video_path,
-            'quiet': True, # Suppress console output from yt-dlp
-            'merge_output_format': 'mp4',
-            'overwrites': True, # Overwrite file if it exists
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        
-        print(f"Tool: Video saved to {video_path}")
-        
-        if not os.path.exists(video_path):
-             raise FileNotFoundError("yt-dlp failed to download the video file.")
+        video_path = os.path.join(output_dir, "original_video.mp4")
+        result = {"video_path": video_path}
 
-        # --- Audio Extraction (MoviePy part remains the same) ---
-        print("Tool: Extracting audio...")
-        video_clip = VideoFileClip(video_path)
-        audio_filename = "original_audio.mp3"
-        audio_path = os.path.join(output_dir, audio_filename)
-        video_clip.audio.write_audiofile(audio_path, logger=None)
-        video_clip.close()
-        print(f"Tool: Audio saved to {audio_path}")
+        # Kick off the larger video download first so that it overlaps with the audio
+        if download_video_stream:
+            result["video_download"] = start_video_download(url, video_path)
 
-        return {"video_path": video_path, "audio_path": audio_path}
+        result["audio_path"] = download_audio(url, output_dir)
+        return result
 
     except Exception as e:
         # Catching yt-dlp specific errors or any other exception
-        error_message = f"An error occurred in yt-dlp or moviepy: {e}"
+        error_message = f"An error occurred in yt-dlp or ffmpeg: {e}"
         print(f"ERROR in media_tools: {error_message}")
         return {"error": error_message}
-    
 
 
-def combine_video_and_audio(video_path: str, audio_path: str, output_path: str) -> dict:
+def remux_video_and_audio(video_path: str, audio_path: str, output_path: str):
+    """
+    Replaces the audio of a video with ffmpeg, copying the video stream bit-for-bit.
+    The new audio is stream-copied as well when it is already AAC, and encoded to AAC otherwise.
+
+    Raises:
+        ffmpeg.Error: If the streams cannot be placed in the output container without re-encoding.
+    """
+    video = ffmpeg.input(video_path)
+    audio = ffmpeg.input(audio_path)
+    (
+        ffmpeg.output(
+            video["v:0"], audio["a:0"], output_path,
+            vcodec="copy", movflags="+faststart", **aac_audio_options(audio_path),
+        )
+        .overwrite_output()
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+
+
+def combine_video_and_audio(video_path: str, audio_path: str, output_path: str,
+                            encoding_profile: str | None = None) -> dict:
     """
     A tool that combines a video file with a new audio track.
+    The video stream is copied as-is whenever the container allows it (seconds instead of
+    minutes). Otherwise, or when the encoding profile limits the resolution below the
+    source's, the video is re-encoded with the profile's settings (see src.tools.video_encoding).
     
     Args:
         video_path (str): Path to the original video file (without its original audio).
         audio_path (str): Path to the new audio file to be added.
         output_path (str): Path to save the final, combined video file.
+        encoding_profile (str): The encoding profile; defaults to ENCODING_PROFILE.
 
     Returns:
         dict: A dictionary with the path to the final video file.
@@ -75,23 +227,24 @@ def combine_video_and_audio(video_path: str, audio_path: str, output_path: str)
     """
     try:
         print("Tool: Combining final video and dubbed audio...")
-        
-        # Load the original video clip
-        video_clip = VideoFileClip(video_path)
-        
-        # Load the new dubbed audio clip
-        dubbed_audio_clip = AudioFileClip(audio_path)
-        
-        # Set the audio of the video clip to our new audio
-        final_clip = video_clip.set_audio(dubbed_audio_clip)
-        
-        # Write the result to a file
-        final_clip.write_videofile(output_path, codec='libx264', audio_codec='aac', logger=None)
-        
-        # Close the clips to free up resources
-        video_clip.close()
-        dubbed_audio_clip.close()
-        final_clip.close()
+        profile = get_encoding_profile(encoding_profile)
+
+        if exceeds_profile(video_path, profile):
+            print(f"Tool: Scaling the video down to {profile['max_height']}p for the {profile['name']} profile...")
+            encode_video_and_audio(video_path, audio_path, output_path, profile)
+        else:
+            copy_error = None
+            with media_slot():
+                try:
+                    remux_video_and_audio(video_path, audio_path, output_path)
+                    print("Tool: Video stream copied without re-encoding.")
+                except ffmpeg.Error as e:
+                    stderr = e.stderr.decode("utf-8", errors="ignore").strip().splitlines() if e.stderr else []
+                    copy_error = stderr[-1] if stderr else str(e)
+            # The encode takes media slots of its own, so it runs outside of this one
+            if copy_error:
+                print(f"Tool: Stream copy not possible ({copy_error}), re-encoding instead...")
+                encode_video_and_audio(video_path, audio_path, output_path, profile)
         
         print(f"Tool: Final video successfully saved to {output_path}")
         return {"final_video_path": output_path}
@@ -99,4 +252,109 @@ def combine_video_and_audio(video_path: str, audio_path: str, output_path: str)
     except Exception as e:
         error_message = f"An error occurred during video-audio combination: {e}"
         print(f"ERROR in media_tools: {error_message}")
-        return {"error": error_message}
\ No newline at end of file
+        return {"error": error_message}
+
+
+def get_media_duration(path: str) -> float:
+    """
+    Returns the duration of an audio or video file in seconds, using ffprobe.
+    """
+    probe = ffmpeg.probe(path)
+    return float(probe["format"]["duration"])
+
+
+def detect_silences(audio_path: str, noise_db: int = -35, min_silence: float = 0.5) -> list:
+    """
+    Finds the silent stretches of an audio file with ffmpeg's 'silencedetect' filter.
+
+    Returns:
+        list: (start, end) tuples in seconds, in chronological order.
+    """
+    _, stderr = (
+        ffmpeg.input(audio_path)
+        .filter("silencedetect", noise=f"{noise_db}dB", d=min_silence)
+        .output("-", format="null")
+        .run(capture_stderr=True, quiet=True)
+    )
+    log = stderr.decode("utf-8", errors="ignore")
+    starts = [float(v) for v in re.findall(r"silence_start: (-?[\d.]+)", log)]
+    ends = [float(v) for v in re.findall(r"silence_end: ([\d.]+)", log)]
+    return [(max(0.0, start), end) for start, end in zip(starts, ends)]
+
+
+def plan_chunks(duration: float, silences: list, target_seconds: float) -> list:
+    """
+    Chooses chunk boundaries of roughly target_seconds, preferring the middle of a silence
+    so that no word is cut in half. Falls back to a hard cut when a stretch up to twice
+    the target length contains no silence at all.
+
+    Returns:
+        list: (start, end) tuples in seconds covering the whole duration.
+    """
+    cut_points = [(start + end) / 2 for start, end in silences]
+    chunks = []
+    cursor = 0.0
+    while duration - cursor > target_seconds * 1.5:
+        ideal = cursor + target_seconds
+        candidates = [c for c in cut_points if cursor + target_seconds / 2 <= c <= cursor + target_seconds * 2]
+        cut = min(candidates, key=lambda c: abs(c - ideal)) if candidates else ideal
+        chunks.append((cursor, cut))
+        cursor = cut
+    chunks.append((cursor, duration))
+    return chunks
+
+
+def plan_windows(duration: float, silences: list, target_seconds: float, overlap: float) -> list:
+    """
+    Plans overlapping windows for long audio: the chunks of plan_chunks, each widened by
+    overlap seconds on both sides, so speech cut at a boundary is heard whole in one window.
+    Every window owns the part between its own cut points ('core_start' to 'core_end').
+
+    Returns:
+        list: One dict per window with 'start', 'end', 'core_start' and 'core_end' in seconds.
+    """
+    return [
+        {
+            "start": max(0.0, start - overlap),
+            "end": min(duration, end + overlap),
+            "core_start": start,
+            "core_end": end,
+        }
+        for start, end in plan_chunks(duration, silences, target_seconds)
+    ]
+
+
+def extract_audio_window(audio_path: str, output_path: str, start: float, end: float) -> str:
+    """
+    Writes the audio between start and end (in seconds) as a 16 kHz mono MP3,
+    which is all a speech model needs.
+    """
+    (
+        ffmpeg.input(audio_path, ss=start, t=end - start)
+        .output(output_path, ac=1, ar=16000, audio_bitrate="48k")
+        .overwrite_output()
+        .run(quiet=True)
+    )
+    return output_path
+
+
+def split_audio_at_silences(audio_path: str, output_dir: str, target_seconds: float = 120) -> list:
+    """
+    A tool that splits an audio file into chunks of about target_seconds at silence boundaries.
+    Every chunk is written as a 16 kHz mono MP3 (see extract_audio_window).
+
+    Returns:
+        list: One dict per chunk with 'path', 'start' and 'end' (seconds in the source audio).
+    """
+    with media_slot():
+        duration = get_media_duration(audio_path)
+        chunks = plan_chunks(duration, detect_silences(audio_path), target_seconds)
+        os.makedirs(output_dir, exist_ok=True)
+
+        print(f"Tool: Splitting {duration:.1f}s of audio into {len(chunks)} chunk(s)...")
+        result = []
+        for index, (start, end) in enumerate(chunks):
+            chunk_path = extract_audio_window(audio_path, os.path.join(output_dir, f"chunk_{index:04d}.mp3"),
+                                              start, end)
+            result.append({"path": chunk_path, "start": start, "end": end})
+    return result
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import threading
+import time
+
+# Default settings, overridable through API_RATE_LIMIT / API_RATE_BURST
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_BURST = 5
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket that limits how many API requests start per minute.
+    Up to 'burst' requests may start back to back; after that they are spaced evenly.
+    A limit of 0 (or less) means no limit.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = DEFAULT_BURST):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Takes one token and returns how many seconds the caller must wait before using it.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Blocks until the caller may send one request.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """
+        Waits, without blocking the event loop, until the caller may send one request.
+        Async and threaded callers share the same bucket.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide limiter shared by every Gemini request.
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            requests_per_minute = float(os.getenv("API_RATE_LIMIT", DEFAULT_REQUESTS_PER_MINUTE))
+            burst = int(os.getenv("API_RATE_BURST", DEFAULT_BURST))
+            _limiter = RateLimiter(requests_per_minute, burst)
+    return _limiter
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import time
+
+from src.instrumentation import record_retry
+
+# Defaults, overridable through RETRY_ATTEMPTS / RETRY_BASE_DELAY, or per stage
+# through <STAGE>_RETRY_ATTEMPTS / <STAGE>_RETRY_BASE_DELAY (e.g. TTS_RETRY_ATTEMPTS)
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 2.0
+
+
+def retry_settings(stage: str | None = None) -> tuple:
+    """
+    Returns (attempts, base_delay) for a pipeline stage such as 'transcription',
+    'translation' or 'tts', falling back to the global settings.
+    """
+    prefix = f"{stage.upper()}_" if stage else ""
+    attempts = os.getenv(f"{prefix}RETRY_ATTEMPTS") or os.getenv("RETRY_ATTEMPTS", DEFAULT_ATTEMPTS)
+    base_delay = os.getenv(f"{prefix}RETRY_BASE_DELAY") or os.getenv("RETRY_BASE_DELAY", DEFAULT_BASE_DELAY)
+    return max(1, int(attempts)), float(base_delay)
+
+
+def retry_tool(tool, *args, stage: str | None = None, **kwargs) -> dict:
+    """
+    Calls a tool that reports failures as {'error': message} and retries it with
+    exponential backoff (base_delay, 2 * base_delay, 4 * base_delay, ...).
+    The number of attempts and the base delay are configured per stage.
+
+    Returns:
+        dict: The first successful result, or the last error result.
+    """
+    attempts, base_delay = retry_settings(stage)
+    result = {"error": "Tool was never called."}
+    for attempt in range(1, attempts + 1):
+        result = tool(*args, **kwargs)
+        if "error" not in result:
+            return result
+        record_retry(stage, tool.__name__, attempt, attempts, attempt < attempts)
+        if attempt < attempts:
+            delay = base_delay * 2 ** (attempt - 1)
+            print(f"Retry: {tool.__name__} failed (attempt {attempt}/{attempts}), retrying in {delay:.0f}s...")
+            time.sleep(delay)
+    return result
+
+
+async def retry_tool_async(tool, *args, stage: str | None = None, **kwargs) -> dict:
+    """
+    The async counterpart of retry_tool, for coroutine tools. Waits between attempts
+    without blocking the event loop.
+
+    Returns:
+        dict: The first successful result, or the last error result.
+    """
+    attempts, base_delay = retry_settings(stage)
+    result = {"error": "Tool was never called."}
+    for attempt in range(1, attempts + 1):
+        result = await tool(*args, **kwargs)
+        if "error" not in result:
+            return result
+        record_retry(stage, tool.__name__, attempt, attempts, attempt < attempts)
+        if attempt < attempts:
+            delay = base_delay * 2 ** (attempt - 1)
+            print(f"Retry: {tool.__name__} failed (attempt {attempt}/{attempts}), retrying in {delay:.0f}s...")
+            await asyncio.sleep(delay)
+    return result
@@ -0,0 +1,45 @@
+import sqlite3
+from contextlib import contextmanager
+
+# Milliseconds a connection waits for another writer before failing with "database is locked"
+BUSY_TIMEOUT_MS = 30000
+
+
+def connect(path: str, row_factory=None) -> sqlite3.Connection:
+    """
+    Opens a connection to one of the SQLite stores (clip cache, translation memory, job queue).
+
+    A fresh connection per call keeps a store usable from any thread or process. The
+    connection is in autocommit mode (transactions are opened explicitly) and the database
+    in WAL mode, so readers never block the writer and concurrent workers only wait on
+    each other's writes, for up to BUSY_TIMEOUT_MS.
+
+    Args:
+        path (str): The database file.
+        row_factory: The row factory of the connection (e.g. sqlite3.Row); tuples by default.
+    """
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    try:
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        # Persistent in the database file; a no-op once set
+        conn.execute("PRAGMA journal_mode = WAL")
+        # Durable across application crashes in WAL mode; only a power loss may drop the last commits
+        conn.execute("PRAGMA synchronous = NORMAL")
+    except sqlite3.Error:
+        conn.close()
+        raise
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    return conn
+
+
+@contextmanager
+def connection(path: str, row_factory=None):
+    """
+    connect() as a context manager that closes the connection on exit.
+    """
+    conn = connect(path, row_factory)
+    try:
+        yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,320 @@
+import os
+import re
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.tools.concurrency import media_slot
+from src.tools.media_tools import (
+    detect_silences, extract_audio_window, get_media_duration, plan_windows, split_audio_at_silences,
+)
+from src.backends.registry import get_transcription_backend
+from src.tools.retry import retry_tool, retry_tool_async
+
+# Defaults, overridable through TRANSCRIPTION_CHUNK_SECONDS / TRANSCRIPTION_MAX_WORKERS
+DEFAULT_CHUNK_SECONDS = 120
+DEFAULT_MAX_WORKERS = 4
+
+# Long-audio mode, for audio longer than TRANSCRIPTION_LONG_AUDIO_SECONDS: overlapping
+# windows (TRANSCRIPTION_WINDOW_OVERLAP seconds on each side) are extracted one by one, and
+# up to TRANSCRIPTION_PREFETCH windows are uploaded while others are being transcribed
+DEFAULT_LONG_AUDIO_SECONDS = 1800
+DEFAULT_WINDOW_OVERLAP = 3.0
+DEFAULT_PREFETCH = 2
+
+# Timestamps of the same speech differ a little between windows
+OVERLAP_TOLERANCE = 0.3
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _settings() -> dict:
+    return {
+        "chunk_seconds": float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", DEFAULT_CHUNK_SECONDS)),
+        "max_workers": max(1, int(os.getenv("TRANSCRIPTION_MAX_WORKERS", DEFAULT_MAX_WORKERS))),
+        "long_audio_seconds": float(os.getenv("TRANSCRIPTION_LONG_AUDIO_SECONDS", DEFAULT_LONG_AUDIO_SECONDS)),
+        "overlap": float(os.getenv("TRANSCRIPTION_WINDOW_OVERLAP", DEFAULT_WINDOW_OVERLAP)),
+        "prefetch": max(0, int(os.getenv("TRANSCRIPTION_PREFETCH", DEFAULT_PREFETCH))),
+    }
+
+
+def segmentation_key() -> str:
+    """
+    Returns the settings that decide how the audio is cut into requests, for cache keys.
+    """
+    settings = _settings()
+    return f"{settings['chunk_seconds']:g}/{settings['long_audio_seconds']:g}/{settings['overlap']:g}"
+
+
+def transcribe_segments(audio_path: str, work_dir: str, backend=None) -> dict:
+    """
+    A tool that turns an audio file into a list of timed transcript segments.
+
+    The audio is split at silence boundaries into chunks of a few minutes, and the chunks
+    are transcribed concurrently, so a long video takes roughly as long as its slowest chunk.
+
+    Args:
+        audio_path (str): The path to the audio file.
+        work_dir (str): A directory for the intermediate audio chunks.
+        backend: The transcription backend; defaults to the configured one.
+
+    Returns:
+        dict: {'segments': [...], 'transcription': full text}, where every segment has
+              'id', 'start', 'end', 'text' and 'speaker' with times in the source audio.
+              Returns {'error': message} on failure.
+    """
+    settings = _settings()
+    max_workers = settings["max_workers"]
+    backend = backend or get_transcription_backend()
+
+    try:
+        duration = get_media_duration(audio_path)
+        if duration > settings["long_audio_seconds"]:
+            windows = _plan_long_audio(audio_path, duration, settings)
+        else:
+            chunks = split_audio_at_silences(audio_path, work_dir, settings["chunk_seconds"])
+    except Exception as e:
+        error_message = f"An error occurred while splitting the audio: {e}"
+        print(f"ERROR in transcription_engine: {error_message}")
+        return {"error": error_message}
+
+    if duration > settings["long_audio_seconds"]:
+        return _transcribe_windows(audio_path, work_dir, backend, windows, settings)
+
+    print(f"Tool: Transcribing {len(chunks)} chunk(s) with up to {max_workers} worker(s)...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda chunk: retry_tool(backend.transcribe_chunk, chunk["path"], chunk["end"] - chunk["start"],
+                                     stage="transcription"),
+            chunks,
+        ))
+
+    return _merge_chunk_results(chunks, results)
+
+
+async def transcribe_segments_async(audio_path: str, work_dir: str, backend=None) -> dict:
+    """
+    The async counterpart of transcribe_segments: splitting runs in a worker thread and
+    the chunks are transcribed as concurrent coroutines, at most TRANSCRIPTION_MAX_WORKERS
+    at a time.
+
+    Returns:
+        dict: {'segments': [...], 'transcription': full text}.
+              Returns {'error': message} on failure.
+    """
+    settings = _settings()
+    max_workers = settings["max_workers"]
+    backend = backend or get_transcription_backend()
+
+    try:
+        duration = await asyncio.to_thread(get_media_duration, audio_path)
+        if duration > settings["long_audio_seconds"]:
+            windows = await asyncio.to_thread(_plan_long_audio, audio_path, duration, settings)
+        else:
+            chunks = await asyncio.to_thread(split_audio_at_silences, audio_path, work_dir, settings["chunk_seconds"])
+    except Exception as e:
+        error_message = f"An error occurred while splitting the audio: {e}"
+        print(f"ERROR in transcription_engine: {error_message}")
+        return {"error": error_message}
+
+    if duration > settings["long_audio_seconds"]:
+        return await _transcribe_windows_async(audio_path, work_dir, backend, windows, settings)
+
+    print(f"Tool: Transcribing {len(chunks)} chunk(s), up to {max_workers} at a time...")
+    limit = asyncio.Semaphore(max_workers)
+
+    async def transcribe(chunk):
+        async with limit:
+            return await retry_tool_async(backend.transcribe_chunk_async, chunk["path"],
+                                          chunk["end"] - chunk["start"], stage="transcription")
+
+    results = await asyncio.gather(*(transcribe(chunk) for chunk in chunks))
+    return _merge_chunk_results(chunks, results)
+
+
+def _merge_chunk_results(chunks: list, results: list) -> dict:
+    """
+    Joins the per-chunk results into one list of segments on the timeline of the whole
+    audio and removes the chunk files.
+    """
+    segments = []
+    for chunk, result in zip(chunks, results):
+        if "error" in result:
+            return {"error": result["error"]}
+        for segment in result["segments"]:
+            # Shift chunk-relative times onto the timeline of the whole audio
+            segments.append({
+                "id": len(segments),
+                "start": round(chunk["start"] + segment["start"], 3),
+                "end": round(chunk["start"] + segment["end"], 3),
+                "text": segment["text"],
+                "speaker": segment.get("speaker"),
+            })
+
+    for chunk in chunks:
+        os.remove(chunk["path"])
+
+    transcription = " ".join(segment["text"] for segment in segments)
+    return {"segments": segments, "transcription": transcription}
+
+
+# --- Long-audio mode ---
+
+def _plan_long_audio(audio_path: str, duration: float, settings: dict) -> list:
+    with media_slot():
+        windows = plan_windows(duration, detect_silences(audio_path), settings["chunk_seconds"], settings["overlap"])
+    print(f"Tool: Long audio ({duration:.0f}s): transcribing {len(windows)} overlapping window(s), "
+          f"up to {settings['max_workers']} at a time with {settings['prefetch']} uploaded ahead...")
+    return windows
+
+
+def _extract_window(audio_path: str, path: str, window: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with media_slot():
+        extract_audio_window(audio_path, path, window["start"], window["end"])
+
+
+def _remove(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _transcribe_windows(audio_path: str, work_dir: str, backend, windows: list, settings: dict) -> dict:
+    """
+    Transcribes long audio window by window. Each window is extracted, uploaded,
+    transcribed and released (remote and local file) on its own, so only the windows
+    in flight exist at any time. The pool has TRANSCRIPTION_PREFETCH more threads than
+    there are transcription slots: those extract and upload the next windows while
+    the current ones are being transcribed.
+    """
+    transcribe_slots = threading.Semaphore(settings["max_workers"])
+    failed = threading.Event()
+
+    def transcribe(item):
+        index, window = item
+        if failed.is_set():
+            return {"error": "Cancelled after another window failed.", "cancelled": True}
+        path = os.path.join(work_dir, f"window_{index:04d}.mp3")
+        try:
+            try:
+                _extract_window(audio_path, path, window)
+            except Exception as e:
+                failed.set()
+                return {"error": f"An error occurred while extracting audio window {index}: {e}"}
+            uploaded = retry_tool(backend.upload_chunk, path, stage="transcription")
+            if "error" in uploaded:
+                failed.set()
+                return uploaded
+            try:
+                with transcribe_slots:
+                    result = retry_tool(backend.transcribe_uploaded, uploaded["upload"],
+                                        window["end"] - window["start"], stage="transcription")
+            finally:
+                backend.release_chunk(uploaded["upload"])
+            if "error" in result:
+                failed.set()
+            return result
+        finally:
+            _remove(path)
+
+    with ThreadPoolExecutor(max_workers=settings["max_workers"] + settings["prefetch"]) as executor:
+        results = list(executor.map(transcribe, enumerate(windows)))
+    return _merge_window_results(windows, results)
+
+
+async def _transcribe_windows_async(audio_path: str, work_dir: str, backend, windows: list, settings: dict) -> dict:
+    """
+    The async counterpart of _transcribe_windows: one coroutine per window, with at most
+    TRANSCRIPTION_MAX_WORKERS + TRANSCRIPTION_PREFETCH windows in flight.
+    """
+    in_flight = asyncio.Semaphore(settings["max_workers"] + settings["prefetch"])
+    transcribe_slots = asyncio.Semaphore(settings["max_workers"])
+    failed = asyncio.Event()
+
+    async def transcribe(index, window):
+        async with in_flight:
+            if failed.is_set():
+                return {"error": "Cancelled after another window failed.", "cancelled": True}
+            path = os.path.join(work_dir, f"window_{index:04d}.mp3")
+            try:
+                try:
+                    await asyncio.to_thread(_extract_window, audio_path, path, window)
+                except Exception as e:
+                    failed.set()
+                    return {"error": f"An error occurred while extracting audio window {index}: {e}"}
+                uploaded = await retry_tool_async(backend.upload_chunk_async, path, stage="transcription")
+                if "error" in uploaded:
+                    failed.set()
+                    return uploaded
+                try:
+                    async with transcribe_slots:
+                        result = await retry_tool_async(backend.transcribe_uploaded_async, uploaded["upload"],
+                                                        window["end"] - window["start"], stage="transcription")
+                finally:
+                    await backend.release_chunk_async(uploaded["upload"])
+                if "error" in result:
+                    failed.set()
+                return result
+            finally:
+                _remove(path)
+
+    results = await asyncio.gather(*(transcribe(index, window) for index, window in enumerate(windows)))
+    return _merge_window_results(windows, results)
+
+
+def _words(text: str) -> list:
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def _drop_repeated_words(previous: dict, segment: dict) -> dict | None:
+    """
+    Removes the words at the start of a segment that repeat the end of the previous one,
+    i.e. speech near a window boundary that both overlapping windows transcribed.
+
+    Returns:
+        dict: The segment with the repetition removed, or None if nothing is left of it.
+    """
+    previous_words, words = _words(previous["text"]), _words(segment["text"])
+    repeated = next((n for n in range(min(len(previous_words), len(words)), 0, -1)
+                     if previous_words[-n:] == words[:n]), 0)
+    if not repeated:
+        return segment
+    if repeated == len(words):
+        return None
+    # Cut the original text after its n-th word, keeping its punctuation and casing
+    cut = list(_WORD.finditer(segment["text"]))[repeated - 1].end()
+    text = segment["text"][cut:].lstrip(" ,.;:!?-")
+    return {**segment, "text": text} if text else None
+
+
+def _merge_window_results(windows: list, results: list) -> dict:
+    """
+    Joins the results of overlapping windows into one list of segments on the timeline
+    of the whole audio. A segment whose midpoint lies past a window's own part (between
+    its cut points) is left to the next window, which hears it whole. The next window's
+    segments in the overlap are only kept if they reach beyond what is already covered,
+    and words repeated across the boundary are removed from them.
+    """
+    errors = [result for result in results if "error" in result]
+    if errors:
+        return {"error": next((e for e in errors if not e.get("cancelled")), errors[0])["error"]}
+
+    segments = []
+    for number, (window, result) in enumerate(zip(windows, results)):
+        is_last = number == len(windows) - 1
+        for segment in result["segments"]:
+            start = round(window["start"] + segment["start"], 3)
+            end = round(window["start"] + segment["end"], 3)
+            middle = (start + end) / 2
+            covered = segments[-1]["end"] if segments else 0.0
+            if middle >= window["core_end"] and not is_last:
+                continue
+            if middle < window["core_start"] and end <= covered + OVERLAP_TOLERANCE:
+                continue
+            shifted = {"start": start, "end": end, "text": segment["text"], "speaker": segment.get("speaker")}
+            if segments and start < covered:
+                shifted = _drop_repeated_words(segments[-1], shifted)
+            if shifted:
+                segments.append({"id": len(segments), **shifted})
+
+    transcription = " ".join(segment["text"] for segment in segments)
+    return {"segments": segments, "transcription": transcription}
@@ -0,0 +1,163 @@
+import os
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from src.backends.registry import get_translation_backend
+from src.metrics import get_metrics
+from src.tools.retry import retry_tool, retry_tool_async
+from src.tools.translation_memory import get_translation_memory
+
+# Defaults, overridable through TRANSLATION_BATCH_CHARS / TRANSLATION_BATCH_SEGMENTS / TRANSLATION_MAX_WORKERS
+DEFAULT_BATCH_CHARS = 4000
+DEFAULT_BATCH_SEGMENTS = 50
+DEFAULT_MAX_WORKERS = 4
+
+
+def make_batches(segments: list, max_chars: int, max_segments: int) -> list:
+    """
+    Groups consecutive segments into batches of at most max_chars characters of text
+    and max_segments segments. A single segment longer than max_chars gets its own batch.
+    """
+    batches = []
+    current = []
+    current_chars = 0
+    for segment in segments:
+        length = len(segment["text"])
+        if current and (current_chars + length > max_chars or len(current) >= max_segments):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(segment)
+        current_chars += length
+    if current:
+        batches.append(current)
+    return batches
+
+
+def translate_segments_batched(segments: list, target_language: str, backend=None) -> dict:
+    """
+    A tool that translates transcript segments in concurrent, size-bounded batches.
+
+    Segments found in the translation memory are not sent again, and new translations
+    are added to it. Each batch stays well below the model's output limit and is retried
+    on its own if it fails. Every Gemini request goes through the shared API_RATE_LIMIT
+    limiter in gemini_client, so adding workers never exceeds the configured quota.
+
+    Args:
+        segments (list): Segments with at least 'id' and 'text'.
+        target_language (str): The language to translate the text into.
+        backend: The translation backend; defaults to the configured one.
+
+    Returns:
+        dict: {'translations': {segment id: translated text}} covering every segment.
+              Returns {'error': message} on failure.
+    """
+    max_chars = int(os.getenv("TRANSLATION_BATCH_CHARS", DEFAULT_BATCH_CHARS))
+    max_segments = int(os.getenv("TRANSLATION_BATCH_SEGMENTS", DEFAULT_BATCH_SEGMENTS))
+    max_workers = int(os.getenv("TRANSLATION_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    backend = backend or get_translation_backend()
+
+    remembered, segments = _recall(segments, target_language, backend)
+    if not segments:
+        return {"translations": remembered}
+
+    batches = make_batches(segments, max_chars, max_segments)
+    print(f"Tool: Translating {len(segments)} segment(s) in {len(batches)} batch(es) "
+          f"with up to {max_workers} worker(s)...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda batch: retry_tool(backend.translate_segments, batch, target_language, stage="translation"),
+            batches,
+        ))
+
+    result = _collect_translations(results)
+    if "error" not in result:
+        _memorize(segments, result["translations"], target_language, backend)
+        result["translations"].update(remembered)
+    return result
+
+
+async def translate_segments_batched_async(segments: list, target_language: str, backend=None) -> dict:
+    """
+    The async counterpart of translate_segments_batched: the batches are translated as
+    concurrent coroutines, at most TRANSLATION_MAX_WORKERS at a time.
+
+    Returns:
+        dict: {'translations': {segment id: translated text}} covering every segment.
+              Returns {'error': message} on failure.
+    """
+    max_chars = int(os.getenv("TRANSLATION_BATCH_CHARS", DEFAULT_BATCH_CHARS))
+    max_segments = int(os.getenv("TRANSLATION_BATCH_SEGMENTS", DEFAULT_BATCH_SEGMENTS))
+    max_workers = int(os.getenv("TRANSLATION_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    backend = backend or get_translation_backend()
+
+    # The translation memory is a SQLite database; keep its queries off the event loop
+    remembered, segments = await asyncio.to_thread(_recall, segments, target_language, backend)
+    if not segments:
+        return {"translations": remembered}
+
+    batches = make_batches(segments, max_chars, max_segments)
+    print(f"Tool: Translating {len(segments)} segment(s) in {len(batches)} batch(es), "
+          f"up to {max_workers} at a time...")
+    limit = asyncio.Semaphore(max(1, max_workers))
+
+    async def translate(batch):
+        async with limit:
+            return await retry_tool_async(backend.translate_segments_async, batch, target_language, stage="translation")
+
+    result = _collect_translations(await asyncio.gather(*(translate(batch) for batch in batches)))
+    if "error" not in result:
+        await asyncio.to_thread(_memorize, segments, result["translations"], target_language, backend)
+        result["translations"].update(remembered)
+    return result
+
+
+def _recall(segments: list, target_language: str, backend) -> tuple:
+    """
+    Serves segments from the translation memory, if it is enabled. A memory that cannot
+    be read is reported and skipped; it never fails the translation.
+
+    Returns:
+        tuple: ({segment id: remembered translation}, the segments still to translate).
+    """
+    memory = get_translation_memory()
+    if memory is None:
+        return {}, segments
+    try:
+        hits = memory.lookup([segment["text"] for segment in segments], target_language, backend.model_name)
+    except sqlite3.Error as e:
+        print(f"WARNING in translation_engine: Translation memory lookup failed: {e}")
+        return {}, segments
+
+    exact = sum(1 for _, similarity in hits.values() if similarity >= 1.0)
+    metrics = get_metrics()
+    metrics.inc("dubsync_translation_memory_segments_total", exact, result="exact")
+    metrics.inc("dubsync_translation_memory_segments_total", len(hits) - exact, result="fuzzy")
+    metrics.inc("dubsync_translation_memory_segments_total", len(segments) - len(hits), result="miss")
+    if hits:
+        print(f"Tool: Translation memory: {exact} exact and {len(hits) - exact} fuzzy hit(s) "
+              f"for {len(segments)} segment(s).")
+
+    remembered = {segments[index]["id"]: translation for index, (translation, _) in hits.items()}
+    return remembered, [segment for index, segment in enumerate(segments) if index not in hits]
+
+
+def _memorize(segments: list, translations: dict, target_language: str, backend):
+    memory = get_translation_memory()
+    if memory is None:
+        return
+    try:
+        memory.store([(segment["text"], translations[segment["id"]]) for segment in segments],
+                     target_language, backend.model_name)
+    except sqlite3.Error as e:
+        print(f"WARNING in translation_engine: Could not update the translation memory: {e}")
+
+
+def _collect_translations(results: list) -> dict:
+    translations = {}
+    for index, result in enumerate(results):
+        if "error" in result:
+            return {"error": f"Translation batch {index + 1}/{len(results)} failed: {result['error']}"}
+        translations.update(result["translations"])
+    return {"translations": translations}
@@ -0,0 +1,223 @@
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from src.tools.cache import hash_text
+from src.tools.sqlite_util import connection
+
+# Defaults, overridable through TRANSLATION_MEMORY_PATH / TRANSLATION_MEMORY_THRESHOLD
+DEFAULT_MEMORY_PATH = "./translation_memory.db"
+DEFAULT_THRESHOLD = 0.92
+
+# Near-duplicates are found with MinHash over character shingles: NUM_BANDS bands of
+# ROWS_PER_BAND hashes each. Two texts with a shingle similarity of 0.8 share a band
+# with a probability of 98.5%; every candidate is then checked with the exact similarity.
+SHINGLE_SIZE = 5
+NUM_BANDS = 8
+ROWS_PER_BAND = 4
+
+# One random 64-bit mask per MinHash function, XOR-ed into the shingle hashes; fixed, so
+# signatures stay comparable with those already stored
+_MASKS = [random.Random(20240601 + i).getrandbits(64) for i in range(NUM_BANDS * ROWS_PER_BAND)]
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes a source segment for lookups: Unicode NFKC, lower case and single spaces.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+
+def _shingles(text: str) -> set:
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def _similarity(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _band_buckets(shingles: set) -> list:
+    """
+    Returns the LSH bucket of every band of the text's MinHash signature.
+    """
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+    signature = [min(map(mask.__xor__, hashes)) for mask in _MASKS]
+    return [
+        f"{band}:" + hashlib.blake2b(repr(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]).encode(),
+                                     digest_size=8).hexdigest()
+        for band in range(NUM_BANDS)
+    ]
+
+
+class TranslationMemory:
+    """
+    A persistent store of translated segments in a local SQLite database, shared by all
+    jobs, so recurring intros, outros, sponsor reads and phrases are translated only once
+    and always the same way.
+
+    Entries are keyed by the normalized source text within a scope (target language and
+    translation model). Lookups return exact hits, and near-duplicates whose shingle
+    similarity reaches the threshold. Texts whose numbers differ never match fuzzily,
+    since a reused translation would carry the wrong number.
+    """
+
+    def __init__(self, path: str | None = None, threshold: float | None = None):
+        self.path = path or os.getenv("TRANSLATION_MEMORY_PATH", DEFAULT_MEMORY_PATH)
+        self.threshold = float(threshold if threshold is not None
+                               else os.getenv("TRANSLATION_MEMORY_THRESHOLD", DEFAULT_THRESHOLD))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with connection(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    scope TEXT NOT NULL,
+                    source_key TEXT NOT NULL,
+                    source_text TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL,
+                    UNIQUE (scope, source_key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    scope TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    segment_id INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (scope, bucket)")
+
+    @staticmethod
+    def _scope(target_language: str, model_name: str) -> str:
+        return f"{normalize(target_language)}|{model_name}"
+
+    def lookup(self, texts: list, target_language: str, model_name: str) -> dict:
+        """
+        Looks up source segments.
+
+        Returns:
+            dict: {index in texts: (translation, similarity)} for every hit;
+                  the similarity is 1.0 for exact hits.
+        """
+        scope = self._scope(target_language, model_name)
+        normalized = [normalize(text) for text in texts]
+        hits = {}
+        used = set()
+        indices = {}
+        for index, text in enumerate(normalized):
+            if text:
+                indices.setdefault(hash_text(text), []).append(index)
+
+        with connection(self.path) as conn:
+            keys = list(indices)
+            # Stay below SQLite's limit on query parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT id, source_key, translation FROM segments WHERE scope = ? "
+                    f"AND source_key IN ({', '.join('?' * len(batch))})",
+                    (scope, *batch),
+                ).fetchall()
+                for segment_id, source_key, translation in rows:
+                    for index in indices.pop(source_key):
+                        hits[index] = (translation, 1.0)
+                    used.add(segment_id)
+
+            if self.threshold < 1.0:
+                # What is left has no exact hit; repeated texts are matched once
+                for same_text in indices.values():
+                    match = self._fuzzy_match(conn, scope, normalized[same_text[0]])
+                    if match:
+                        segment_id, translation, similarity = match
+                        for index in same_text:
+                            hits[index] = (translation, similarity)
+                        used.add(segment_id)
+
+            now = time.time()
+            conn.executemany("UPDATE segments SET hits = hits + 1, used_at = ? WHERE id = ?",
+                             [(now, segment_id) for segment_id in used])
+        return hits
+
+    def _fuzzy_match(self, conn: sqlite3.Connection, scope: str, text: str) -> tuple | None:
+        shingles = _shingles(text)
+        buckets = _band_buckets(shingles)
+        rows = conn.execute(
+            f"SELECT DISTINCT s.id, s.source_text, s.translation FROM buckets b JOIN segments s ON s.id = b.segment_id "
+            f"WHERE b.scope = ? AND b.bucket IN ({', '.join('?' * len(buckets))})",
+            (scope, *buckets),
+        ).fetchall()
+
+        best = None
+        numbers = _NUMBER.findall(text)
+        for segment_id, source_text, translation in rows:
+            if _NUMBER.findall(source_text) != numbers:
+                continue
+            similarity = _similarity(shingles, _shingles(source_text))
+            if similarity >= self.threshold and (best is None or similarity > best[2]):
+                best = (segment_id, translation, similarity)
+        return best
+
+    def store(self, pairs: list, target_language: str, model_name: str):
+        """
+        Adds (source text, translation) pairs, replacing the translation of known sources.
+        """
+        scope = self._scope(target_language, model_name)
+        now = time.time()
+        with connection(self.path) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for source, translation in pairs:
+                    text = normalize(source)
+                    if not text:
+                        continue
+                    key = hash_text(text)
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO segments (scope, source_key, source_text, translation, created_at, used_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (scope, key, text, translation, now, now),
+                    )
+                    if cursor.rowcount:
+                        conn.executemany(
+                            "INSERT INTO buckets (scope, bucket, segment_id) VALUES (?, ?, ?)",
+                            [(scope, bucket, cursor.lastrowid) for bucket in _band_buckets(_shingles(text))],
+                        )
+                    else:
+                        conn.execute(
+                            "UPDATE segments SET translation = ?, used_at = ? WHERE scope = ? AND source_key = ?",
+                            (translation, now, scope, key),
+                        )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> dict:
+        with connection(self.path) as conn:
+            segments, hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM segments").fetchone()
+        return {"segments": segments, "hits": hits}
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> TranslationMemory | None:
+    """
+    Returns the process-wide translation memory, or None when TRANSLATION_MEMORY_ENABLED is false.
+    """
+    global _memory
+    if os.getenv("TRANSLATION_MEMORY_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+    return _memory
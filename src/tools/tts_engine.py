@@ -0,0 +1,336 @@
+import os
+import re
+import sqlite3
+import asyncio
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import aiofiles
+from src.backends.registry import get_tts_backend
+from src.metrics import get_metrics
+from src.tools.cache import hash_text
+from src.tools.clip_cache import get_clip_cache
+from src.tools.retry import retry_tool, retry_tool_async
+
+# Cloud TTS rejects inputs above 5000 bytes; stay a little below to be safe
+MAX_TTS_BYTES = 4800
+
+# Default, overridable through TTS_MAX_WORKERS
+DEFAULT_MAX_WORKERS = 8
+
+# BCP-47 codes of the TTS voices by target language, extended or overridden through
+# TTS_LANGUAGE_CODES (e.g. "Portuguese=pt-PT,Swahili=sw-KE")
+LANGUAGE_CODES = {
+    "Arabic": "ar-XA",
+    "Chinese": "cmn-CN",
+    "Dutch": "nl-NL",
+    "English": "en-US",
+    "French": "fr-FR",
+    "German": "de-DE",
+    "Hindi": "hi-IN",
+    "Italian": "it-IT",
+    "Japanese": "ja-JP",
+    "Korean": "ko-KR",
+    "Polish": "pl-PL",
+    "Portuguese": "pt-BR",
+    "Russian": "ru-RU",
+    "Spanish": "es-ES",
+    "Turkish": "tr-TR",
+}
+
+_LANGUAGE_CODE = re.compile(r"^[a-z]{2,3}-[A-Za-z]{2,4}$")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…。！？])\s+")
+
+
+def _byte_length(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _split_long_sentence(sentence: str, max_bytes: int) -> list:
+    """
+    Splits a single sentence that is too long on its own, at word boundaries.
+    """
+    pieces = []
+    current = ""
+    for word in sentence.split():
+        candidate = f"{current} {word}".strip()
+        if current and _byte_length(candidate) > max_bytes:
+            pieces.append(current)
+            candidate = word
+        current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def language_code_for(language: str) -> str | None:
+    """
+    Returns the BCP-47 code of the TTS voice for a target language, given by name
+    (case-insensitively) or directly as a code such as 'pt-PT'.
+
+    Returns:
+        str: The language code, or None when the language is not supported.
+    """
+    language = (language or "").strip()
+    if _LANGUAGE_CODE.match(language):
+        return language
+
+    codes = dict(LANGUAGE_CODES)
+    for pair in os.getenv("TTS_LANGUAGE_CODES", "").split(","):
+        name, _, code = pair.partition("=")
+        if name.strip() and code.strip():
+            codes[name.strip()] = code.strip()
+    return {name.lower(): code for name, code in codes.items()}.get(language.lower())
+
+
+def split_sentences(text: str, max_bytes: int = MAX_TTS_BYTES) -> list:
+    """
+    Splits text into sentences, the unit of TTS requests and of the speech clip cache.
+    A sentence above max_bytes (UTF-8) is further split at word boundaries.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if _byte_length(sentence) > max_bytes:
+            pieces.extend(_split_long_sentence(sentence, max_bytes))
+        elif sentence:
+            pieces.append(sentence)
+    return pieces
+
+
+def clip_key(sentence: str, language_code: str, backend) -> str:
+    """
+    Returns the speech clip cache key of a sentence: its normalized text, the voice,
+    the language and the audio configuration of the backend.
+    """
+    text = " ".join(unicodedata.normalize("NFKC", sentence).split())
+    return hash_text("clip", text, backend.voice_name(language_code), language_code, backend.audio_config())
+
+
+def synthesize_segments(segments: list, language_code: str, output_dir: str, dubbed_audio_path: str,
+                        backend=None) -> dict:
+    """
+    A tool that synthesizes every translated segment into its own MP3 file and
+    stream-concatenates them, in order, into one dubbed track.
+
+    Segments are split into sentences and every distinct sentence is synthesized only
+    once: repeated sentences re-use the same clip, and clips synthesized by earlier jobs
+    come straight from the speech clip cache. The remaining clips are synthesized
+    concurrently by the TTS backend. Every clip is appended to its segment file and to
+    the full track as soon as it is next in line, so apart from repeated clips only the
+    requests in flight are ever held in memory.
+
+    Args:
+        segments (list): Translated segments with 'id', 'start', 'end' and 'text'.
+        language_code (str): The BCP-47 language code (e.g., 'tr-TR').
+        output_dir (str): The directory for the per-segment files.
+        dubbed_audio_path (str): Where to write the concatenated track.
+        backend: The TTS backend; defaults to the configured one.
+
+    Returns:
+        dict: {'dubbed_segments': [{'id', 'start', 'end', 'path'}], 'dubbed_audio_path': path}.
+              Returns {'error': message} on failure.
+    """
+    max_workers = int(os.getenv("TTS_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    backend = backend or get_tts_backend()
+    clip_cache = get_clip_cache()
+    track, clips, dubbed_segments = _plan_clips(segments, language_code, output_dir, backend)
+    pending = _pending_clips(clips, clip_cache)
+    _announce(segments, track, clips, pending, f"with up to {max_workers} worker(s)")
+
+    def synthesize(key):
+        return retry_tool(backend.synthesize, clips[key]["text"], language_code, clips[key]["path"], stage="tts")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {key: executor.submit(synthesize, key) for key in pending}
+
+        def clip_audio(key) -> tuple:
+            if key in futures:
+                result = futures[key].result()
+            else:
+                audio = _cached_audio(clip_cache, key)
+                if audio is not None:
+                    return audio, None
+                # Evicted since the clips were planned
+                result = synthesize(key)
+            if "error" in result:
+                return None, result["error"]
+            return _take_clip(clips[key]["path"], key, clip_cache), None
+
+        uses = Counter(key for _, key in track)
+        held = {}
+        opened = set()
+        with open(dubbed_audio_path, "wb") as full_track:
+            for segment_id, key in track:
+                audio = held.pop(key, None)
+                if audio is None:
+                    audio, error = clip_audio(key)
+                    if error:
+                        # Stop scheduling the remaining clips; running ones finish on their own
+                        for future in futures.values():
+                            future.cancel()
+                        return {"error": error}
+                uses[key] -= 1
+                if uses[key]:
+                    held[key] = audio
+
+                # MP3 frames are self-contained, so byte-level concatenation is a valid stream
+                mode = "ab" if segment_id in opened else "wb"
+                opened.add(segment_id)
+                with open(dubbed_segments[segment_id]["path"], mode) as segment_file:
+                    segment_file.write(audio)
+                full_track.write(audio)
+
+    return {
+        "dubbed_segments": [dubbed_segments[segment["id"]] for segment in segments if segment["id"] in opened],
+        "dubbed_audio_path": dubbed_audio_path,
+    }
+
+
+async def synthesize_segments_async(segments: list, language_code: str, output_dir: str,
+                                    dubbed_audio_path: str, backend=None) -> dict:
+    """
+    The async counterpart of synthesize_segments: every clip that is not cached is
+    synthesized by a coroutine of the TTS backend, at most TTS_MAX_WORKERS at a time,
+    and the clips are written in order with aiofiles as they come in.
+
+    Returns:
+        dict: {'dubbed_segments': [{'id', 'start', 'end', 'path'}], 'dubbed_audio_path': path}.
+              Returns {'error': message} on failure.
+    """
+    max_workers = int(os.getenv("TTS_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+    backend = backend or get_tts_backend()
+    clip_cache = get_clip_cache()
+    # Planning looks the clips up in the cache database; keep it off the event loop
+    track, clips, dubbed_segments = await asyncio.to_thread(_plan_clips, segments, language_code, output_dir, backend)
+    pending = await asyncio.to_thread(_pending_clips, clips, clip_cache)
+    _announce(segments, track, clips, pending, f"up to {max_workers} at a time")
+    limit = asyncio.Semaphore(max(1, max_workers))
+
+    async def synthesize(key):
+        async with limit:
+            return await retry_tool_async(backend.synthesize_async, clips[key]["text"], language_code,
+                                          clips[key]["path"], stage="tts")
+
+    tasks = {key: asyncio.create_task(synthesize(key)) for key in pending}
+
+    async def clip_audio(key) -> tuple:
+        if key in tasks:
+            result = await tasks[key]
+        else:
+            audio = await asyncio.to_thread(_cached_audio, clip_cache, key)
+            if audio is not None:
+                return audio, None
+            # Evicted since the clips were planned
+            result = await synthesize(key)
+        if "error" in result:
+            return None, result["error"]
+        return await asyncio.to_thread(_take_clip, clips[key]["path"], key, clip_cache), None
+
+    try:
+        uses = Counter(key for _, key in track)
+        held = {}
+        opened = set()
+        async with aiofiles.open(dubbed_audio_path, "wb") as full_track:
+            for segment_id, key in track:
+                audio = held.pop(key, None)
+                if audio is None:
+                    audio, error = await clip_audio(key)
+                    if error:
+                        return {"error": error}
+                uses[key] -= 1
+                if uses[key]:
+                    held[key] = audio
+
+                mode = "ab" if segment_id in opened else "wb"
+                opened.add(segment_id)
+                async with aiofiles.open(dubbed_segments[segment_id]["path"], mode) as segment_file:
+                    await segment_file.write(audio)
+                await full_track.write(audio)
+    finally:
+        # After a failure, stop the clips that are still waiting or in flight
+        for task in tasks.values():
+            task.cancel()
+
+    return {
+        "dubbed_segments": [dubbed_segments[segment["id"]] for segment in segments if segment["id"] in opened],
+        "dubbed_audio_path": dubbed_audio_path,
+    }
+
+
+def _plan_clips(segments: list, language_code: str, output_dir: str, backend) -> tuple:
+    """
+    Splits every segment into sentences and assigns each distinct sentence one clip.
+
+    Returns:
+        tuple: ([(segment id, clip key), ...] in track order,
+                {clip key: {'text', 'path'}} for every distinct sentence,
+                {segment id: {'id', 'start', 'end', 'path'}}).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    track = []
+    clips = {}
+    for segment in segments:
+        for sentence in split_sentences(segment["text"]):
+            key = clip_key(sentence, language_code, backend)
+            track.append((segment["id"], key))
+            clips.setdefault(key, {"text": sentence, "path": os.path.join(output_dir, f"clip_{key[:16]}.mp3")})
+
+    dubbed_segments = {
+        segment["id"]: {
+            "id": segment["id"],
+            "start": segment["start"],
+            "end": segment["end"],
+            "path": os.path.join(output_dir, f"seg_{segment['id']:04d}.mp3"),
+        }
+        for segment in segments
+    }
+    return track, clips, dubbed_segments
+
+
+def _pending_clips(clips: dict, clip_cache) -> list:
+    """
+    Returns the keys of the clips that have to be synthesized, i.e. are not cached.
+    """
+    cached = set()
+    if clip_cache:
+        try:
+            cached = clip_cache.present(list(clips))
+        except sqlite3.Error as e:
+            print(f"WARNING in tts_engine: Speech clip cache lookup failed: {e}")
+    return [key for key in clips if key not in cached]
+
+
+def _announce(segments: list, track: list, clips: dict, pending: list, concurrency: str):
+    metrics = get_metrics()
+    metrics.inc("dubsync_tts_clips_total", len(pending), source="synthesized")
+    metrics.inc("dubsync_tts_clips_total", len(clips) - len(pending), source="cache")
+    metrics.inc("dubsync_tts_clips_total", len(track) - len(clips), source="repeated")
+    print(f"Tool: Synthesizing {len(segments)} segment(s): {len(track)} sentence(s), {len(clips)} distinct, "
+          f"{len(clips) - len(pending)} cached, {len(pending)} request(s) {concurrency}...")
+
+
+def _cached_audio(clip_cache, key: str) -> bytes | None:
+    if clip_cache is None:
+        return None
+    try:
+        return clip_cache.get(key)
+    except sqlite3.Error as e:
+        print(f"WARNING in tts_engine: Could not read speech clip {key[:12]}: {e}")
+        return None
+
+
+def _take_clip(path: str, key: str, clip_cache) -> bytes:
+    """
+    Reads a freshly synthesized clip, removes its file and adds it to the clip cache.
+    """
+    with open(path, "rb") as f:
+        audio = f.read()
+    os.remove(path)
+    if clip_cache:
+        try:
+            clip_cache.put(key, audio)
+        except sqlite3.Error as e:
+            print(f"WARNING in tts_engine: Could not cache speech clip {key[:12]}: {e}")
+    return audio
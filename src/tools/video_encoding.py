@@ -0,0 +1,173 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import ffmpeg
+from src.tools.concurrency import media_slot
+
+# Settings of the libx264 encode by profile: the speed preset, the quality (CRF, lower is
+# better), the encoder threads per ffmpeg process (0: sized to the host, see
+# encode_video_and_audio) and the maximum output height (None: keep the source's).
+# A profile with a maximum height re-encodes every video taller than that.
+ENCODING_PROFILES = {
+    "fast": {"preset": "veryfast", "crf": 26, "threads": 0, "max_height": 720},
+    "balanced": {"preset": "medium", "crf": 23, "threads": 0, "max_height": None},
+    "quality": {"preset": "slow", "crf": 19, "threads": 0, "max_height": None},
+}
+
+# Defaults, overridable through ENCODING_PROFILE / ENCODING_SEGMENT_SECONDS / ENCODING_WORKERS
+# (which defaults to MEDIA_CONCURRENCY, or one per CPU core). ENCODING_PRESET, ENCODING_CRF,
+# ENCODING_THREADS and ENCODING_MAX_HEIGHT override a single setting of every profile.
+DEFAULT_PROFILE = "balanced"
+DEFAULT_SEGMENT_SECONDS = 20
+
+
+def get_encoding_profile(name: str | None = None) -> dict:
+    """
+    Returns the settings of an encoding profile, ENCODING_PROFILE by default.
+
+    Raises:
+        ValueError: If the profile does not exist.
+    """
+    name = (name or os.getenv("ENCODING_PROFILE", DEFAULT_PROFILE)).lower()
+    if name not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile '{name}'. Choose one of: {', '.join(ENCODING_PROFILES)}.")
+
+    profile = {"name": name, **ENCODING_PROFILES[name]}
+    for key, cast in (("preset", str), ("crf", int), ("threads", int), ("max_height", int)):
+        value = os.getenv(f"ENCODING_{key.upper()}")
+        if value:
+            profile[key] = cast(value)
+    return profile
+
+
+def aac_audio_options(audio_path: str) -> dict:
+    """
+    Returns the ffmpeg output options for an audio track in an MP4: stream copy when it
+    is already AAC, an AAC encode otherwise.
+    """
+    audio_streams = [s for s in ffmpeg.probe(audio_path)["streams"] if s["codec_type"] == "audio"]
+    if audio_streams and audio_streams[0]["codec_name"] == "aac":
+        return {"acodec": "copy"}
+    return {"acodec": "aac", "audio_bitrate": "192k"}
+
+
+def exceeds_profile(video_path: str, profile: dict) -> bool:
+    """
+    Tells whether a video is taller than the profile allows, i.e. has to be scaled down.
+    """
+    if not profile.get("max_height"):
+        return False
+    streams = [s for s in ffmpeg.probe(video_path)["streams"] if s["codec_type"] == "video"]
+    return bool(streams) and int(streams[0].get("height") or 0) > profile["max_height"]
+
+
+def _video_options(profile: dict, threads: int) -> dict:
+    options = {
+        "vcodec": "libx264",
+        "preset": profile["preset"],
+        "crf": profile["crf"],
+        "pix_fmt": "yuv420p",
+        "threads": threads,
+    }
+    if profile.get("max_height"):
+        # Never scale up; -2 keeps the aspect ratio with an even width
+        options["vf"] = f"scale=-2:'min({profile['max_height']},ih)'"
+    return options
+
+
+def _run(stream):
+    stream.overwrite_output().run(capture_stdout=True, capture_stderr=True)
+
+
+def encode_video_and_audio(video_path: str, audio_path: str, output_path: str, profile: dict | None = None,
+                           segment_seconds: float | None = None):
+    """
+    Combines a video with a new audio track, re-encoding the video stream with libx264
+    according to an encoding profile.
+
+    Videos longer than two segments are encoded in segments: the video stream is split at
+    keyframes without decoding, the segments are encoded in parallel by up to
+    ENCODING_WORKERS ffmpeg processes (each holding a media slot), and the encoded segments
+    are concatenated and muxed with the audio by stream copy. Each process gets an equal
+    share of the CPU cores unless the profile sets its threads.
+
+    Args:
+        profile (dict): See get_encoding_profile; defaults to the configured profile.
+        segment_seconds (float): Segment length; 0 encodes in one piece.
+                                 Defaults to ENCODING_SEGMENT_SECONDS.
+
+    Raises:
+        ffmpeg.Error: If ffmpeg fails.
+    """
+    profile = profile or get_encoding_profile()
+    if segment_seconds is None:
+        segment_seconds = float(os.getenv("ENCODING_SEGMENT_SECONDS", DEFAULT_SEGMENT_SECONDS))
+    workers = int(os.getenv("ENCODING_WORKERS") or os.getenv("MEDIA_CONCURRENCY") or os.cpu_count() or 1)
+    duration = float(ffmpeg.probe(video_path)["format"].get("duration") or 0)
+
+    if segment_seconds > 0 and workers > 1 and duration >= 2 * segment_seconds:
+        work_dir = tempfile.mkdtemp(prefix="encode_", dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            if _encode_segmented(video_path, audio_path, output_path, profile, segment_seconds, workers, work_dir):
+                return
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"Tool: Encoding the video in one piece ({profile['name']} profile: "
+          f"preset {profile['preset']}, CRF {profile['crf']})...")
+    video = ffmpeg.input(video_path)
+    audio = ffmpeg.input(audio_path)
+    with media_slot():
+        _run(ffmpeg.output(
+            video["v:0"], audio["a:0"], output_path,
+            movflags="+faststart", **_video_options(profile, profile["threads"]), **aac_audio_options(audio_path),
+        ))
+
+
+def _encode_segmented(video_path: str, audio_path: str, output_path: str, profile: dict,
+                      segment_seconds: float, workers: int, work_dir: str) -> bool:
+    """
+    The segmented mode of encode_video_and_audio.
+
+    Returns:
+        bool: False, without writing the output, when the video has too few keyframes to be split.
+    """
+    # With stream copy, the segment muxer can only cut at keyframes: every segment starts with one
+    with media_slot():
+        _run(ffmpeg.input(video_path)["v:0"].output(
+            os.path.join(work_dir, "part_%05d.mkv"),
+            c="copy", f="segment", segment_time=segment_seconds, reset_timestamps=1,
+        ))
+    parts = sorted(os.path.join(work_dir, name) for name in os.listdir(work_dir) if name.startswith("part_"))
+    if len(parts) < 2:
+        return False
+
+    workers = min(workers, len(parts))
+    threads = profile["threads"] or max(1, (os.cpu_count() or 1) // workers)
+    print(f"Tool: Encoding the video in {len(parts)} segment(s) on {workers} worker(s) x {threads} thread(s) "
+          f"({profile['name']} profile: preset {profile['preset']}, CRF {profile['crf']})...")
+
+    def encode_part(part: str) -> str:
+        encoded_path = part.replace("part_", "encoded_").replace(".mkv", ".mp4")
+        with media_slot():
+            _run(ffmpeg.input(part)["v:0"].output(encoded_path, **_video_options(profile, threads)))
+        return encoded_path
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        encoded = list(executor.map(encode_part, parts))
+
+    list_path = os.path.join(work_dir, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in encoded:
+            escaped = path.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    video = ffmpeg.input(list_path, f="concat", safe=0)
+    audio = ffmpeg.input(audio_path)
+    with media_slot():
+        _run(ffmpeg.output(
+            video["v:0"], audio["a:0"], output_path,
+            vcodec="copy", movflags="+faststart", **aac_audio_options(audio_path),
+        ))
+    return True
@@ -0,0 +1,98 @@
+import os
+import re
+import shutil
+import time
+import uuid
+
+# Defaults, overridable through OUTPUT_DIRECTORY / TEMP_DIRECTORY / WORKSPACE_RETENTION_HOURS
+DEFAULT_OUTPUT_DIRECTORY = "./output"
+DEFAULT_TEMP_DIRECTORY = "./temp"
+DEFAULT_RETENTION_HOURS = 168
+
+# The names of job directories: new_job_id() and the queue's job_id_for() give 12 hex digits
+_JOB_ID = re.compile(r"[0-9a-f]{12}")
+
+
+def new_job_id() -> str:
+    """
+    Returns a short, unique job ID, also used as the name of the job's directories.
+    """
+    return uuid.uuid4().hex[:12]
+
+
+def _contains(directory: str, path: str) -> bool:
+    """
+    Tells whether path is directory itself or lies inside it.
+    """
+    directory, path = os.path.realpath(directory), os.path.realpath(path)
+    return os.path.commonpath([directory, path]) == directory
+
+
+def create_workspace(job_id: str | None = None) -> dict:
+    """
+    A tool that creates the isolated directories of one dubbing job.
+
+    Final results go to <OUTPUT_DIRECTORY>/<job_id> and intermediates (downloads, chunks,
+    synthesized speech) to <TEMP_DIRECTORY>/<job_id>, so concurrent jobs never share a file.
+    If the temp directory would contain the output directory (e.g. both settings point to
+    the same place), intermediates go to <output_dir>/tmp instead, so that cleaning them
+    up never deletes the results.
+
+    Returns:
+        dict: {'job_id', 'output_dir', 'temp_dir'}.
+    """
+    job_id = job_id or new_job_id()
+    output_dir = os.path.join(os.getenv("OUTPUT_DIRECTORY", DEFAULT_OUTPUT_DIRECTORY), job_id)
+    temp_dir = os.path.join(os.getenv("TEMP_DIRECTORY", DEFAULT_TEMP_DIRECTORY), job_id)
+    if _contains(temp_dir, output_dir):
+        temp_dir = os.path.join(output_dir, "tmp")
+        print(f"Tool: TEMP_DIRECTORY overlaps OUTPUT_DIRECTORY; keeping intermediates in {temp_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(temp_dir, exist_ok=True)
+    return {"job_id": job_id, "output_dir": output_dir, "temp_dir": temp_dir}
+
+
+def cleanup_workspace(temp_dir: str, keep: list | None = None):
+    """
+    Deletes the intermediate files of a job, unless KEEP_INTERMEDIATES is set.
+    Nothing is deleted if temp_dir contains any of the paths in keep (the job's results).
+    """
+    if os.getenv("KEEP_INTERMEDIATES", "false").lower() in ("1", "true", "yes"):
+        print(f"Tool: Keeping intermediate files in {temp_dir}")
+        return
+    protected = [path for path in (keep or []) if path and _contains(temp_dir, path)]
+    if protected:
+        print(f"WARNING in workspace: Not removing {temp_dir}, it contains the job's results ({protected[0]})")
+        return
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    print(f"Tool: Removed intermediate files in {temp_dir}")
+
+
+def prune_workspaces(retention_hours: float | None = None) -> int:
+    """
+    A tool that enforces the retention policy: job directories under OUTPUT_DIRECTORY and
+    TEMP_DIRECTORY that have not been modified for retention_hours are deleted. Only
+    directories named like a job ID are considered, so other contents of a shared
+    directory are never touched.
+
+    Returns:
+        int: The number of directories removed.
+    """
+    if retention_hours is None:
+        retention_hours = float(os.getenv("WORKSPACE_RETENTION_HOURS", DEFAULT_RETENTION_HOURS))
+    cutoff = time.time() - retention_hours * 3600
+
+    removed = 0
+    for root in (os.getenv("OUTPUT_DIRECTORY", DEFAULT_OUTPUT_DIRECTORY),
+                 os.getenv("TEMP_DIRECTORY", DEFAULT_TEMP_DIRECTORY)):
+        if not os.path.isdir(root):
+            continue
+        for name in os.listdir(root):
+            job_dir = os.path.join(root, name)
+            if _JOB_ID.fullmatch(name) and os.path.isdir(job_dir) and os.path.getmtime(job_dir) < cutoff:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                removed += 1
+
+    if removed:
+        print(f"Tool: Retention policy removed {removed} old job directory(ies).")
+    return removed